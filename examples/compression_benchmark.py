@@ -0,0 +1,65 @@
+"""
+Benchmark: compressed size versus CPU time for AAA card payloads.
+
+Builds a corpus of App Analysis Agent cards, then compresses each card
+individually with every available algorithm, with and without a trained
+dictionary.
+"""
+
+import sys
+import os
+import contextlib
+import io
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from adaptive_card_builder import AAACards
+from adaptive_card_builder.compression import benchmark
+from adaptive_card_builder.encoding import encode_card
+
+
+def build_corpus(count: int = 200):
+    """Build ``count`` encoded AAA cards with varying titles and menus."""
+    aaa = AAACards()
+    corpus = []
+    # AAACards prints its components; keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            sheets = [
+                {"title": f"Sheet {j}", "sheetId": f"sheet-{i}-{j}", "iconUrl": "AddOutline"}
+                for j in range(i % 8 + 1)
+            ]
+            card = {
+                "type": "AdaptiveCard",
+                "body": aaa.create_skeleton()
+                + [
+                    aaa.create_top_bar("Calculated measure (KPI)", f"Total Sales {i}"),
+                    aaa.create_chart(
+                        {"chartType": "barchart", "qId": f"chart-{i}"},
+                        [{"chartType": "linechart"}, {"chartType": "table"}],
+                    ),
+                    aaa.create_buttons(
+                        add_to_sheet=True,
+                        sheet_list_actions=aaa.menuList(sheets),
+                        is_narrative_set=False,
+                        card={"type": "AdaptiveCard", "body": []},
+                    ),
+                ],
+            }
+            corpus.append(encode_card(card))
+    return corpus
+
+
+def main():
+    corpus = build_corpus()
+    print(f"{len(corpus)} cards, {sum(map(len, corpus)) / len(corpus):.0f} bytes avg")
+    print(f"{'algorithm':<10}{'level':>6}{'dict':>6}{'ratio':>8}{'comp us':>10}{'decomp us':>11}")
+    for row in benchmark(corpus):
+        print(
+            f"{row['algorithm']:<10}{row['level']:>6}{str(row['dictionary']):>6}"
+            f"{row['ratio']:>8.2f}{row['compress_us']:>10.1f}{row['decompress_us']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: thread-pool batch rendering versus a single thread.
+
+Run it once on the regular (GIL) CPython build and once on the free-threaded
+build (e.g. ``python3.13t``) to compare scaling:
+
+    python examples/threaded_benchmark.py
+    python3.13t examples/threaded_benchmark.py
+"""
+
+import sys
+import os
+import contextlib
+import io
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from adaptive_card_builder.threaded import StripedCache, ThreadedRenderer
+
+
+def build_requests(count: int = 2000):
+    """A mix of AAA card calls with varying titles and menu sizes."""
+    requests = []
+    for i in range(count):
+        sheets = [
+            {"title": f"Sheet {j}", "sheetId": f"{i}-{j}", "iconUrl": "AddOutline"}
+            for j in range(i % 8 + 1)
+        ]
+        requests.append(("create_top_bar", ("Calculated measure (KPI)", f"Sales {i}"), {}))
+        requests.append(
+            (
+                "create_buttons",
+                (True, sheets, False, {"type": "AdaptiveCard", "body": []}),
+                {},
+            )
+        )
+    return requests
+
+
+def timed(renderer: ThreadedRenderer, requests) -> float:
+    start = time.perf_counter()
+    renderer.render_batch(requests)
+    return time.perf_counter() - start
+
+
+def main():
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    requests = build_requests()
+    # AAACards prints its components; keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadedRenderer(max_workers=1) as single:
+            timed(single, requests[:100])  # warm up
+            baseline = timed(single, requests)
+            one_call = timed(single, requests[:1])
+        rows = []
+        for workers in (2, 4, 8):
+            with ThreadedRenderer(max_workers=workers) as renderer:
+                rows.append((workers, "no cache", timed(renderer, requests)))
+            with ThreadedRenderer(max_workers=workers, cache=StripedCache()) as renderer:
+                timed(renderer, requests)
+                rows.append((workers, "warm cache", timed(renderer, requests)))
+    print(f"{len(requests)} calls, single thread: {baseline * 1e3:.1f} ms "
+          f"({one_call * 1e6:.0f} us for one call)")
+    for workers, mode, elapsed in rows:
+        print(f"{workers} threads, {mode:<10}: {elapsed * 1e3:8.1f} ms  speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,10 @@ setup(
     install_requires=[
         # No external dependencies
     ],
+    extras_require={
+        "zstd": ["zstandard"],
+        "brotli": ["brotli"],
+    },
     include_package_data=True,
     zip_safe=False,
     keywords="adaptive-cards json microsoft-teams bot-framework",
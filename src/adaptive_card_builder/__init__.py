@@ -12,6 +12,7 @@ from .elements import (
     fact_set,
 )
 from .utils import prettify_json
+from .documents import CardDocument
 
 # Import card builders
 from .cards import AAACards
@@ -30,6 +31,8 @@ __all__ = [
     "fact_set",
     # Utils
     "prettify_json",
+    # Documents
+    "CardDocument",
     # Card Classes
     "AAACards",
 ]
@@ -0,0 +1,392 @@
+"""
+Append-only, memory-mapped archive of rendered cards.
+
+An archive is a directory with two files:
+
+- ``cards.dat``: a header followed by the encoded card payloads, back to back
+- ``cards.idx``: a header followed by one entry per append (offset, length,
+  timestamp, card id and analysisType), used to rebuild the in-memory indexes
+  on open without touching the data file
+
+Both headers carry a generation number. ``compact`` writes the next
+generation of both files beside the current ones and renames them into
+place; if a crash separates the two renames, the next open finishes the
+switch, so a data file is never read through another generation's index.
+
+Reading a card is a dict lookup plus a zero-copy ``memoryview`` slice of the
+mapped data file. Re-appending a card id supersedes the earlier version and
+``delete`` writes a tombstone; ``compact`` rewrites both files without the
+dead records. An archive supports one writing process at a time.
+
+Example:
+    archive = CardArchive("/var/lib/cards")
+    archive.append("card-1", encode_card(card), analysis_type="KPI")
+    payload = archive.get("card-1")
+    recent = archive.find(analysis_type="KPI", start=time.time() - 3600)
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .encoding import encode_card
+
+DATA_FILE = "cards.dat"
+INDEX_FILE = "cards.idx"
+DATA_MAGIC = b"ACBARCH2"
+INDEX_MAGIC = b"ACBINDX2"
+
+_header = struct.Struct("<8sQ")
+_entry = struct.Struct("<QIdHH")
+_TOMBSTONE = 0xFFFFFFFF
+
+
+class ArchiveEntry(NamedTuple):
+    """Location and metadata of one archived card."""
+
+    card_id: str
+    offset: int
+    length: int
+    timestamp: float
+    analysis_type: str
+
+
+class CardArchive:
+    """
+    Memory-mapped card archive with indexes by id, analysisType and timestamp.
+
+    Args:
+        path: Archive directory (created if missing)
+        fsync: Flush appends to disk before returning
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._open()
+
+    def _open(self) -> None:
+        data_path = os.path.join(self.path, DATA_FILE)
+        index_path = os.path.join(self.path, INDEX_FILE)
+        self._recover(data_path, index_path)
+        self._data = open(data_path, "r+b")
+        self._generation = _read_header(self._data, DATA_MAGIC, data_path)
+        self._index = open(index_path, "a+b")
+        self._index.seek(0)
+        if _read_header(self._index, INDEX_MAGIC, index_path) != self._generation:
+            raise ValueError(f"{index_path} does not belong to {data_path}")
+        self._map = None
+        self._load_index()
+        self._remap()
+
+    def _recover(self, data_path: str, index_path: str) -> None:
+        """Create a new archive, or finish a compaction interrupted between renames."""
+        if not os.path.exists(data_path) or os.path.getsize(data_path) == 0:
+            _write_file(data_path, _header.pack(DATA_MAGIC, 0))
+            _write_file(index_path, _header.pack(INDEX_MAGIC, 0))
+            _fsync_dir(self.path)
+        elif not os.path.exists(index_path):
+            raise ValueError(f"{index_path} is missing")
+        data_generation = _peek_generation(data_path, DATA_MAGIC)
+        index_generation = _peek_generation(index_path, INDEX_MAGIC)
+        if data_generation != index_generation:
+            # compact renames the index first, then the data file
+            data_tmp = data_path + ".tmp"
+            if (
+                os.path.exists(data_tmp)
+                and _peek_generation(data_tmp, DATA_MAGIC) == index_generation
+            ):
+                os.replace(data_tmp, data_path)
+                _fsync_dir(self.path)
+            else:
+                raise ValueError(
+                    f"{data_path} (generation {data_generation}) and {index_path} "
+                    f"(generation {index_generation}) do not match"
+                )
+        for leftover in (data_path + ".tmp", index_path + ".tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    def _load_index(self) -> None:
+        self._by_id: Dict[str, ArchiveEntry] = {}
+        self._dead = 0
+        data_size = os.fstat(self._data.fileno()).st_size
+        self._index.seek(0)
+        raw = self._index.read()
+        pos = valid = _header.size
+        while pos + _entry.size <= len(raw):
+            offset, length, timestamp, id_len, type_len = _entry.unpack_from(raw, pos)
+            end = pos + _entry.size + id_len + type_len
+            if end > len(raw):
+                break
+            card_id = raw[pos + _entry.size : pos + _entry.size + id_len].decode()
+            analysis_type = raw[end - type_len : end].decode()
+            if length == _TOMBSTONE:
+                self._dead += card_id in self._by_id
+                self._by_id.pop(card_id, None)
+            elif offset + length <= data_size:
+                self._dead += card_id in self._by_id
+                self._by_id[card_id] = ArchiveEntry(
+                    card_id, offset, length, timestamp, analysis_type
+                )
+            else:
+                break  # data for this entry never reached the disk
+            pos = valid = end
+        if valid != len(raw):
+            self._index.truncate(valid)
+        self._rebuild_secondary()
+
+    def _rebuild_secondary(self) -> None:
+        self._by_type: Dict[str, List[Tuple[float, str]]] = {}
+        self._by_time: List[Tuple[float, str]] = []
+        for entry in self._by_id.values():
+            key = (entry.timestamp, entry.card_id)
+            self._by_time.append(key)
+            self._by_type.setdefault(entry.analysis_type, []).append(key)
+        self._by_time.sort()
+        for keys in self._by_type.values():
+            keys.sort()
+
+    def _remap(self) -> None:
+        # Views handed out by get() keep the previous map alive until released.
+        self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _index_secondary(self, entry: ArchiveEntry, previous: Optional[ArchiveEntry]) -> None:
+        if previous is not None:
+            self._unindex_secondary(previous)
+        key = (entry.timestamp, entry.card_id)
+        bisect.insort(self._by_time, key)
+        bisect.insort(self._by_type.setdefault(entry.analysis_type, []), key)
+
+    def _unindex_secondary(self, entry: ArchiveEntry) -> None:
+        key = (entry.timestamp, entry.card_id)
+        for keys in (self._by_time, self._by_type.get(entry.analysis_type, [])):
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def append(
+        self,
+        card_id: str,
+        card: Any,
+        analysis_type: str = "",
+        timestamp: Optional[float] = None,
+    ) -> ArchiveEntry:
+        """
+        Append one card.
+
+        Args:
+            card_id: Card identifier (a later append with the same id supersedes this one)
+            card: Encoded card bytes, or a card to encode with ``encode_card``
+            analysis_type: analysisType used for lookups
+            timestamp: Seconds since the epoch (now if None)
+
+        Returns:
+            ArchiveEntry of the stored card
+        """
+        return self.append_batch([(card_id, card, analysis_type, timestamp)])[0]
+
+    def append_batch(
+        self, records: Iterable[Tuple[str, Any, str, Optional[float]]]
+    ) -> List[ArchiveEntry]:
+        """
+        Append several cards with one write per file.
+
+        Args:
+            records: (card_id, card, analysis_type, timestamp) tuples, as for ``append``
+
+        Returns:
+            ArchiveEntry per record
+        """
+        now = time.time()
+        with self._lock:
+            offset = self._data.seek(0, os.SEEK_END)
+            data = bytearray()
+            index = bytearray()
+            entries = []
+            for card_id, card, analysis_type, timestamp in records:
+                payload = card if isinstance(card, (bytes, bytearray, memoryview)) else encode_card(card)
+                entry = ArchiveEntry(
+                    card_id,
+                    offset + len(data),
+                    len(payload),
+                    now if timestamp is None else timestamp,
+                    analysis_type or "",
+                )
+                data += payload
+                index += self._pack(entry)
+                entries.append(entry)
+            self._data.write(data)
+            self._data.flush()
+            if self.fsync:
+                os.fsync(self._data.fileno())
+            self._index.write(index)
+            self._index.flush()
+            if self.fsync:
+                os.fsync(self._index.fileno())
+            # Map the new data before publishing entries that point into it.
+            self._remap()
+            for entry in entries:
+                previous = self._by_id.get(entry.card_id)
+                self._dead += previous is not None
+                self._by_id[entry.card_id] = entry
+                self._index_secondary(entry, previous)
+        return entries
+
+    @staticmethod
+    def _pack(entry: ArchiveEntry) -> bytes:
+        card_id = entry.card_id.encode()
+        analysis_type = entry.analysis_type.encode()
+        return (
+            _entry.pack(entry.offset, entry.length, entry.timestamp, len(card_id), len(analysis_type))
+            + card_id
+            + analysis_type
+        )
+
+    def delete(self, card_id: str) -> bool:
+        """
+        Remove a card (space is reclaimed by ``compact``).
+
+        Returns:
+            True if the card existed
+        """
+        with self._lock:
+            entry = self._by_id.pop(card_id, None)
+            if entry is None:
+                return False
+            self._index.write(self._pack(ArchiveEntry(card_id, 0, _TOMBSTONE, time.time(), "")))
+            self._index.flush()
+            self._unindex_secondary(entry)
+            self._dead += 1
+            return True
+
+    def get(self, card_id: str) -> Optional[memoryview]:
+        """
+        Get a card's bytes without copying.
+
+        Args:
+            card_id: Card identifier
+
+        Returns:
+            Read-only memoryview of the encoded card, or None if not archived
+        """
+        with self._lock:
+            entry = self._by_id.get(card_id)
+            if entry is None:
+                return None
+            return memoryview(self._map)[entry.offset : entry.offset + entry.length]
+
+    def entry(self, card_id: str) -> Optional[ArchiveEntry]:
+        with self._lock:
+            return self._by_id.get(card_id)
+
+    def find(
+        self,
+        analysis_type: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Find card ids by analysisType and/or timestamp range.
+
+        Args:
+            analysis_type: Only cards with this analysisType
+            start: Only cards with timestamp >= start
+            end: Only cards with timestamp < end
+
+        Returns:
+            Card ids ordered by timestamp
+        """
+        with self._lock:
+            keys = self._by_time if analysis_type is None else self._by_type.get(analysis_type, [])
+            lo = 0 if start is None else bisect.bisect_left(keys, (start, ""))
+            hi = len(keys) if end is None else bisect.bisect_left(keys, (end, ""))
+            return [card_id for _, card_id in keys[lo:hi]]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._by_id
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cards": len(self._by_id),
+            "dead_records": self._dead,
+            "data_bytes": len(self._map),
+        }
+
+    def compact(self) -> None:
+        """Rewrite the archive without superseded and deleted records."""
+        with self._lock:
+            entries = sorted(self._by_id.values(), key=lambda e: e.offset)
+            generation = self._generation + 1
+            data_path = os.path.join(self.path, DATA_FILE)
+            index_path = os.path.join(self.path, INDEX_FILE)
+            with open(data_path + ".tmp", "wb") as data, open(index_path + ".tmp", "wb") as index:
+                data.write(_header.pack(DATA_MAGIC, generation))
+                index.write(_header.pack(INDEX_MAGIC, generation))
+                offset = _header.size
+                for entry in entries:
+                    data.write(self._map[entry.offset : entry.offset + entry.length])
+                    index.write(self._pack(entry._replace(offset=offset)))
+                    offset += entry.length
+                data.flush()
+                os.fsync(data.fileno())
+                index.flush()
+                os.fsync(index.fileno())
+            self._data.close()
+            self._index.close()
+            # Index first: _recover completes the switch if only this rename happened.
+            os.replace(index_path + ".tmp", index_path)
+            _fsync_dir(self.path)
+            os.replace(data_path + ".tmp", data_path)
+            _fsync_dir(self.path)
+            self._open()
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self) -> "CardArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _read_header(f, magic: bytes, path: str) -> int:
+    raw = f.read(_header.size)
+    if len(raw) != _header.size or raw[: len(magic)] != magic:
+        raise ValueError(f"{path} is not a card archive")
+    return _header.unpack(raw)[1]
+
+
+def _peek_generation(path: str, magic: bytes) -> int:
+    with open(path, "rb") as f:
+        return _read_header(f, magic, path)
+
+
+def _write_file(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # directories cannot be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
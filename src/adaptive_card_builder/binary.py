@@ -0,0 +1,351 @@
+"""
+Compact binary interchange format for cards.
+
+Cards passed between card-building workers and the delivery service can be
+sent in this format instead of JSON text. Property names and common string
+values are interned: a static table covers the names used by the element
+functions and ``AAACards`` (``type``, ``verticalContentAlignment``,
+``fullWidth``, ...), and any other short string is defined once per message
+and referenced afterwards.
+
+``to_json`` transcodes a message straight to JSON text without building
+Python dicts, producing exactly what ``json.dumps`` would for the original
+card.
+
+Wire format (version 1)::
+
+    message := b"ACB" VERSION value
+    value   := NULL | FALSE | TRUE
+             | INT varint(zigzag) | FLOAT float64-le
+             | STR varint(len) utf8 | STR_DEF varint(len) utf8 | STR_REF varint(index)
+             | LIST varint(count) value*
+             | DICT varint(count) (string value)*
+
+``STR_DEF`` strings are appended to the message's string table, which starts
+as ``STATIC_STRINGS``; ``STR_REF`` indexes into it. ``STATIC_STRINGS`` may
+only be extended at the end.
+"""
+
+import struct
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, List, Optional, Tuple
+
+from .utils import _recursive_render
+
+MAGIC = b"ACB"
+VERSION = 1
+
+NULL, FALSE, TRUE, INT, FLOAT, STR, STR_DEF, STR_REF, LIST, DICT = range(10)
+
+# Strings longer than this are written inline instead of being interned.
+MAX_INTERNED_LENGTH = 64
+
+STATIC_STRINGS: Tuple[str, ...] = (
+    # Property names
+    "type", "id", "text", "items", "columns", "actions", "body", "card",
+    "width", "height", "size", "weight", "spacing", "separator", "color",
+    "verticalContentAlignment", "isSkeleton", "variant", "title", "iconUrl",
+    "style", "fullWidth", "verb", "sheetId", "sheetID", "sheetIcon",
+    "targetElements", "actionId", "isEnabled", "isVisible", "layout", "margin",
+    "boxShadow", "boxSizing", "border", "backgroundColor", "activeIconUrl",
+    "activeTitle", "chart", "chartType", "defaultChartType",
+    "alternativeChartTypes", "data_size", "addPaddingLeft", "isSubtle", "wrap",
+    "content", "placeholder", "value", "isMultiline", "maxLength", "min", "max",
+    "valueOn", "valueOff", "choices", "isMultiSelect", "data", "url", "facts",
+    "version", "$schema",
+    # Common values
+    "AdaptiveCard", "TextBlock", "Container", "ColumnSet", "Column", "ActionSet",
+    "Image", "FactSet", "Action.ShowCard", "Action.ToggleVisibility",
+    "Action.Execute", "Action.MenuDropdown", "Action.ShowModal",
+    "Action.Submit", "Action.OpenUrl", "Qlik.Chart", "Qlik.Skeleton",
+    "Qlik.Tag", "small", "large", "bolder", "quiet", "default", "top",
+    "center", "stretch", "padding", "100%", "none", "transparent",
+    "border-box", "rectangle", "info", "s", "addToNewSheet", "elaborate",
+    "moreText", "HideElaboration", "AddOutline", "ViewOutline",
+    "ViewDisabledOutline", "ViewDisabled", "AnswersOutline", "Maximize",
+)
+
+_STATIC_INDEX = {s: i for i, s in enumerate(STATIC_STRINGS)}
+_float = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def dumps(card: Any) -> bytes:
+    """
+    Encode a card in the binary interchange format.
+
+    Args:
+        card: Card, element, dict, list or scalar
+
+    Returns:
+        Binary message bytes
+    """
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    table = dict(_STATIC_INDEX)
+    stack = [_recursive_render(card)]
+    while stack:
+        obj = stack.pop()
+        if obj is None:
+            out.append(NULL)
+        elif obj is True:
+            out.append(TRUE)
+        elif obj is False:
+            out.append(FALSE)
+        elif isinstance(obj, str):
+            index = table.get(obj)
+            if index is not None:
+                out.append(STR_REF)
+                _write_varint(out, index)
+                continue
+            raw = obj.encode("utf-8")
+            if len(obj) <= MAX_INTERNED_LENGTH:
+                table[obj] = len(table)
+                out.append(STR_DEF)
+            else:
+                out.append(STR)
+            _write_varint(out, len(raw))
+            out += raw
+        elif isinstance(obj, int):
+            out.append(INT)
+            _write_varint(out, (obj << 1) if obj >= 0 else ((-obj << 1) - 1))
+        elif isinstance(obj, float):
+            out.append(FLOAT)
+            out += _float.pack(obj)
+        elif isinstance(obj, dict):
+            out.append(DICT)
+            _write_varint(out, len(obj))
+            pending = []
+            for key, value in obj.items():
+                if not isinstance(key, str):
+                    raise TypeError(f"Dict keys must be str, not {type(key).__name__}")
+                pending.append(key)
+                pending.append(value)
+            stack.extend(reversed(pending))
+        elif isinstance(obj, (list, tuple)):
+            out.append(LIST)
+            _write_varint(out, len(obj))
+            stack.extend(reversed(obj))
+        else:
+            raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+    return bytes(out)
+
+
+def _check_header(data) -> None:
+    if bytes(data[:3]) != MAGIC:
+        raise ValueError("Not an adaptive card binary message")
+    if data[3] != VERSION:
+        raise ValueError(f"Unsupported binary message version: {data[3]}")
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a binary message into plain Python objects.
+
+    Args:
+        data: Binary message bytes
+
+    Returns:
+        Card as dicts, lists and scalars
+    """
+    _check_header(data)
+    value, pos = _decode(memoryview(data), 4, list(STATIC_STRINGS))
+    if pos != len(data):
+        raise ValueError("Trailing data after binary message")
+    return value
+
+
+_NO_KEY = object()
+
+
+def _decode(data, pos: int, table: List[str]) -> Tuple[Any, int]:
+    # Containers being filled, innermost last: [container, items left, pending key]
+    stack: List[list] = []
+    while True:
+        tag = data[pos]
+        pos += 1
+        if tag == STR_REF:
+            index, pos = _read_varint(data, pos)
+            value = table[index]
+        elif tag == DICT or tag == LIST:
+            count, pos = _read_varint(data, pos)
+            value = {} if tag == DICT else []
+            if count:
+                stack.append([value, count, _NO_KEY])
+                continue
+        elif tag == STR or tag == STR_DEF:
+            length, pos = _read_varint(data, pos)
+            value = str(data[pos : pos + length], "utf-8")
+            if tag == STR_DEF:
+                table.append(value)
+            pos += length
+        elif tag == INT:
+            n, pos = _read_varint(data, pos)
+            value = (n >> 1) if not n & 1 else -((n + 1) >> 1)
+        elif tag == FLOAT:
+            value = _float.unpack_from(data, pos)[0]
+            pos += 8
+        elif tag == NULL:
+            value = None
+        elif tag == TRUE:
+            value = True
+        elif tag == FALSE:
+            value = False
+        else:
+            raise ValueError(f"Invalid tag {tag} at offset {pos - 1}")
+        # Store the value in its parent, closing every container it completes.
+        while stack:
+            frame = stack[-1]
+            container = frame[0]
+            if type(container) is dict:
+                if frame[2] is _NO_KEY:
+                    frame[2] = value
+                    break
+                container[frame[2]] = value
+                frame[2] = _NO_KEY
+            else:
+                container.append(value)
+            frame[1] -= 1
+            if frame[1]:
+                break
+            stack.pop()
+            value = container
+        else:
+            return value, pos
+
+
+def _floatstr(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def to_json(
+    data: bytes,
+    indent: Optional[int] = None,
+    separators: Optional[Tuple[str, str]] = None,
+    ensure_ascii: bool = True,
+) -> str:
+    """
+    Transcode a binary message directly to JSON text.
+
+    The output is identical to ``json.dumps(loads(data), ...)`` with the same
+    arguments, but no intermediate dicts or lists are built.
+
+    Args:
+        data: Binary message bytes
+        indent: Indentation, as for ``json.dumps``
+        separators: (item, key) separators, as for ``json.dumps``
+        ensure_ascii: Escape non-ASCII characters, as for ``json.dumps``
+
+    Returns:
+        JSON string
+    """
+    _check_header(data)
+    if separators is None:
+        separators = (",", ": ") if indent is not None else (", ", ": ")
+    item_sep, key_sep = separators
+    if isinstance(indent, int):
+        indent = " " * indent
+    quote = encode_basestring_ascii if ensure_ascii else encode_basestring
+    table = list(STATIC_STRINGS)
+    out: List[str] = []
+    view = memoryview(data)
+
+    def string(pos: int) -> Tuple[str, int]:
+        tag = view[pos]
+        if tag == STR_REF:
+            index, pos = _read_varint(view, pos + 1)
+            return table[index], pos
+        if tag != STR and tag != STR_DEF:
+            raise ValueError(f"Expected string at offset {pos}")
+        length, pos = _read_varint(view, pos + 1)
+        value = str(view[pos : pos + length], "utf-8")
+        if tag == STR_DEF:
+            table.append(value)
+        return value, pos + length
+
+    # Containers being written, innermost last: [is dict, items left, level, close]
+    stack: List[list] = []
+    pos = 4
+    level = 0
+    while True:
+        tag = view[pos]
+        if tag in (STR, STR_DEF, STR_REF):
+            value, pos = string(pos)
+            out.append(quote(value))
+        elif tag == DICT or tag == LIST:
+            count, pos = _read_varint(view, pos + 1)
+            open_, close = ("{", "}") if tag == DICT else ("[", "]")
+            if not count:
+                out.append(open_ + close)
+            else:
+                if indent is not None:
+                    out.append(open_ + "\n" + indent * (level + 1))
+                    close = "\n" + indent * level + close
+                else:
+                    out.append(open_)
+                stack.append([tag == DICT, count, level, close])
+                if tag == DICT:
+                    key, pos = string(pos)
+                    out.append(quote(key))
+                    out.append(key_sep)
+                level += 1
+                continue
+        elif tag == INT:
+            n, pos = _read_varint(view, pos + 1)
+            out.append(str((n >> 1) if not n & 1 else -((n + 1) >> 1)))
+        elif tag == FLOAT:
+            out.append(_floatstr(_float.unpack_from(view, pos + 1)[0]))
+            pos += 9
+        else:
+            if tag == NULL:
+                out.append("null")
+            elif tag == TRUE:
+                out.append("true")
+            elif tag == FALSE:
+                out.append("false")
+            else:
+                raise ValueError(f"Invalid tag {tag} at offset {pos}")
+            pos += 1
+        # Move to the next item, closing every container this value completes.
+        while stack:
+            frame = stack[-1]
+            frame[1] -= 1
+            if frame[1]:
+                level = frame[2] + 1
+                out.append(item_sep + "\n" + indent * level if indent is not None else item_sep)
+                if frame[0]:
+                    key, pos = string(pos)
+                    out.append(quote(key))
+                    out.append(key_sep)
+                break
+            stack.pop()
+            out.append(frame[3])
+        else:
+            break
+
+    if pos != len(data):
+        raise ValueError("Trailing data after binary message")
+    return "".join(out)
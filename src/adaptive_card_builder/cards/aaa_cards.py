@@ -17,6 +17,9 @@ from msteamsadaptivecardbuilder import (
     ActionOpenUrl,
     ActionShowCard,
 )
+from ..deferred import REFERENCE_KEY, DeferredStore, reference_card
+from ..instrumentation import instrumented
+from ..text import TextNormalizer
 from ..elements import (
     action_show_modal,
     text_block,
@@ -42,6 +45,7 @@ class AAACards:
     def __init__(self):
         """Initialize the AAACards class."""
 
+    @instrumented("AAACards.create_skeleton")
     def create_skeleton(self) -> List[Dict[str, Any]]:
         """
         Create a Skeleton section for App Analysis Agent card.
@@ -68,8 +72,12 @@ class AAACards:
             to_dict(column_set([], **{"spacing": "padding", "isSkeleton": True})),
         ]
 
+    @instrumented("AAACards.create_top_bar")
     def create_top_bar(
-        self, analysisType: str, title: str | bool = False
+        self,
+        analysisType: str,
+        title: str | bool = False,
+        normalizer: Optional[TextNormalizer] = None,
     ) -> Dict[str, Any]:
         """
         Create the top bar component for App Analysis Agent card.
@@ -77,6 +85,7 @@ class AAACards:
         Args:
             analysisType: Type of analysis (e.g., "performance", "usage", "errors")
             title: Title of the analysis (optional)
+            normalizer: TextNormalizer applied to the title (optional)
         """
 
         column_set1 = column_set(
@@ -110,6 +119,7 @@ class AAACards:
                         else [
                             text_block(
                                 title,
+                                normalizer=normalizer,
                                 size="large",
                                 weight="bolder",
                                 **{"isSubtle": False, "wrap": True, "content": True},
@@ -130,6 +140,7 @@ class AAACards:
 
         return to_dict(finalElement)
 
+    @instrumented("AAACards.create_chart")
     def create_chart(
         self,
         chart: Dict[str, Any],
@@ -144,13 +155,14 @@ class AAACards:
             chart: Chart data dictionary
             alternative_chart_types: List of alternative chart types
             title: Chart title (optional)
-            **kwargs: Additional properties
+            **kwargs: Additional properties (``expand=True`` keeps every chart's data inline)
 
         Returns:
             Qlik.Chart element dictionary
         """
         return qlik_chart(chart, alternative_chart_types, **kwargs)
 
+    @instrumented("AAACards.menuList")
     def menuList(self, sheetData: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
         Generate a list of Action.Execute dicts for the menu dropdown based on sheetData.
@@ -170,17 +182,34 @@ class AAACards:
             )
         return actions
 
+    @instrumented("AAACards.create_buttons")
     def create_buttons(
         self,
         add_to_sheet,
         sheet_list_actions,
         is_narrative_set: bool,
         card: Dict[str, Any],
+        deferred_store: Optional[DeferredStore] = None,
+        elaboration: Optional[Any] = None,
     ):
         """
         Create buttons sections for App Analysis Agent card.
         having 2 buttons in one row and one button below that row
+
+        Args:
+            deferred_store: If given, the Assumptions card is stored there and the
+                Action.ShowCard only carries a reference card
+            elaboration: Elaboration content to store in ``deferred_store``; the
+                elaborate actions then reference it in their ``data``
         """
+        elaboration_data = {}
+        if deferred_store is not None:
+            card = reference_card(deferred_store.put(card, "assumptions"))
+            if elaboration is not None:
+                elaboration_data = {
+                    "data": {REFERENCE_KEY: deferred_store.put(elaboration, "elaboration")}
+                }
+
         button_column_set1 = column(
             items=[
                 action_set(
@@ -233,6 +262,7 @@ class AAACards:
                             "size": "small",
                             "style": "quiet",
                             "verb": "elaborate",
+                            **elaboration_data,
                         }
                     ]
                 )
@@ -262,6 +292,7 @@ class AAACards:
                             "size": "small",
                             "style": "quiet",
                             "verb": "elaborate",
+                            **elaboration_data,
                         }
                     ]
                 )
@@ -0,0 +1,119 @@
+"""
+Side store for heavy subcards loaded on demand.
+
+With ``AAACards.create_buttons(..., deferred_store=store)`` the Assumptions
+card is not embedded in the ``Action.ShowCard``; the action carries a
+lightweight reference card instead, and the full subcard is kept here under a
+content-derived id. The elaboration narrative can be deferred the same way and
+is referenced from the ``elaborate`` actions' ``data``. When the show-card
+action or the ``elaborate`` verb fires, the bot calls ``resolve`` (or
+``fetch``) to get just the subcard.
+
+Example:
+    store = DeferredStore()
+    buttons = aaa.create_buttons(True, menu, False, assumptions, deferred_store=store,
+                                 elaboration=narrative_block)
+    ...
+    subcard = store.resolve(invoke_payload)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .encoding import encode_card
+from .utils import _recursive_render
+
+REFERENCE_KEY = "subcardId"
+
+
+class DeferredStore:
+    """
+    Thread-safe store of deferred subcards keyed by id.
+
+    Ids are derived from the encoded subcard, so identical subcards shared by
+    many cards are stored once.
+
+    Args:
+        max_entries: Oldest entries are evicted beyond this many (None: unbounded)
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def put(self, subcard: Any, kind: str = "subcard") -> str:
+        """
+        Store a subcard.
+
+        The id is a hash of the encoded subcard, so the subcard is still
+        rendered and encoded once per call: deferring shrinks the initial
+        payload, not the time to build it.
+
+        Args:
+            subcard: Card, element, dict or list
+            kind: Prefix of the id (e.g. "assumptions", "elaboration")
+
+        Returns:
+            Subcard id
+        """
+        rendered = _recursive_render(subcard)
+        digest = hashlib.blake2b(encode_card(rendered), digest_size=12).hexdigest()
+        subcard_id = f"{kind}-{digest}"
+        with self._lock:
+            if subcard_id in self._entries:
+                self._entries.move_to_end(subcard_id)
+            else:
+                self._entries[subcard_id] = rendered
+                if self.max_entries is not None and len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return subcard_id
+
+    def fetch(self, subcard_id: str) -> Optional[Any]:
+        """
+        Get a stored subcard.
+
+        Args:
+            subcard_id: Id returned by ``put``
+
+        Returns:
+            The subcard, or None if unknown or evicted
+        """
+        with self._lock:
+            return self._entries.get(subcard_id)
+
+    def resolve(self, action: Dict[str, Any]) -> Optional[Any]:
+        """
+        Get the subcard referenced by an inbound action payload.
+
+        Accepts the ``data`` of an ``elaborate`` invoke, the fired
+        ``Action.ShowCard`` itself, or any dict carrying ``subcardId``.
+
+        Args:
+            action: Inbound action or invoke payload
+
+        Returns:
+            The subcard, or None if the payload references none
+        """
+        for source in (action, action.get("data"), action.get("card"), action.get("value")):
+            if isinstance(source, dict) and isinstance(source.get(REFERENCE_KEY), str):
+                return self.fetch(source[REFERENCE_KEY])
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def reference_card(subcard_id: str) -> Dict[str, Any]:
+    """
+    Create the lightweight card embedded in place of a deferred subcard.
+
+    Args:
+        subcard_id: Id returned by ``DeferredStore.put``
+
+    Returns:
+        Empty AdaptiveCard dictionary carrying the reference
+    """
+    return {"type": "AdaptiveCard", "body": [], REFERENCE_KEY: subcard_id}
@@ -0,0 +1,337 @@
+"""
+Persistent (immutable, path-copying) card documents.
+
+A ``CardDocument`` wraps a frozen copy of a card produced by ``AAACards`` or
+the element functions. Editing a path returns a new document that shares every
+untouched subtree with the original, and each frozen subtree caches its own
+encoded JSON bytes. Fanning one base card out into many variants therefore only
+re-encodes the nodes along the edited paths.
+
+Example:
+    base = CardDocument.from_obj(card)
+    for user in users:
+        variant = base.set(("actions", 0, "actions"), aaa.menuList(user.sheets))
+        send(variant.encode())
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Iterator, Tuple, Union
+
+from .utils import _recursive_render
+
+Path = Tuple[Union[str, int], ...]
+
+_encode_scalar = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class FrozenDict(Mapping):
+    """Immutable mapping node of a card document."""
+
+    __slots__ = ("_data", "_encoded")
+
+    def __init__(self, data: dict):
+        self._data = data
+        self._encoded = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({self._data!r})"
+
+    def _replace(self, key, value) -> "FrozenDict":
+        data = dict(self._data)
+        data[key] = value
+        return FrozenDict(data)
+
+    def _remove(self, key) -> "FrozenDict":
+        data = dict(self._data)
+        del data[key]
+        return FrozenDict(data)
+
+
+class FrozenList(Sequence):
+    """Immutable sequence node of a card document."""
+
+    __slots__ = ("_data", "_encoded")
+
+    def __init__(self, data: tuple):
+        self._data = data
+        self._encoded = None
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"FrozenList({list(self._data)!r})"
+
+    def _replace(self, index: int, value) -> "FrozenList":
+        data = list(self._data)
+        data[index] = value
+        return FrozenList(tuple(data))
+
+    def _remove(self, index: int) -> "FrozenList":
+        data = list(self._data)
+        del data[index]
+        return FrozenList(tuple(data))
+
+
+def freeze(obj: Any) -> Any:
+    """
+    Convert a card (or any part of one) into frozen nodes.
+
+    Element objects are rendered first. Already frozen nodes are reused as-is,
+    so freezing a tree built from existing document fragments shares them.
+
+    Args:
+        obj: Card, element, list, dict or scalar
+
+    Returns:
+        FrozenDict, FrozenList or scalar
+    """
+    return _freeze(_recursive_render(obj))
+
+
+def _freeze(obj: Any) -> Any:
+    if not isinstance(obj, (dict, list, tuple)):
+        return obj
+    # Post-order walk with an explicit stack; shared subtrees are frozen once.
+    frozen = {}
+
+    def get(value):
+        return frozen[id(value)] if isinstance(value, (dict, list, tuple)) else value
+
+    stack = [(obj, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            if isinstance(node, dict):
+                frozen[id(node)] = FrozenDict({k: get(v) for k, v in node.items()})
+            else:
+                frozen[id(node)] = FrozenList(tuple(get(v) for v in node))
+            continue
+        if id(node) in frozen:
+            continue
+        stack.append((node, True))
+        for child in node.values() if isinstance(node, dict) else node:
+            if isinstance(child, (dict, list, tuple)) and id(child) not in frozen:
+                stack.append((child, False))
+    return frozen[id(obj)]
+
+
+def thaw(node: Any) -> Any:
+    """
+    Convert frozen nodes back into plain dicts and lists.
+
+    Args:
+        node: FrozenDict, FrozenList or scalar
+
+    Returns:
+        Plain Python structure (a fresh copy of every container)
+    """
+    if not isinstance(node, (FrozenDict, FrozenList)):
+        return node
+    root = {} if isinstance(node, FrozenDict) else []
+    stack = [(node, root)]
+    while stack:
+        source, target = stack.pop()
+        items = source._data.items() if isinstance(source, FrozenDict) else enumerate(source._data)
+        for key, value in items:
+            if isinstance(value, FrozenDict):
+                copy = {}
+                stack.append((value, copy))
+            elif isinstance(value, FrozenList):
+                copy = []
+                stack.append((value, copy))
+            else:
+                copy = value
+            if isinstance(target, dict):
+                target[key] = copy
+            else:
+                target.append(copy)
+    return root
+
+
+def _encoded(value: Any) -> bytes:
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value._encoded
+    return _encode_scalar(value).encode()
+
+
+def encode_node(node: Any) -> bytes:
+    """
+    Encode a frozen node as compact JSON bytes, caching the result per node.
+
+    Args:
+        node: FrozenDict, FrozenList or scalar
+
+    Returns:
+        UTF-8 JSON bytes equal to ``json.dumps(thaw(node), separators=(",", ":"))``
+    """
+    if not isinstance(node, (FrozenDict, FrozenList)):
+        return _encode_scalar(node).encode()
+    # Post-order walk with an explicit stack, skipping already encoded subtrees.
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        if current._encoded is not None:
+            continue
+        if ready:
+            if isinstance(current, FrozenDict):
+                current._encoded = (
+                    b"{"
+                    + b",".join(
+                        _encode_scalar(str(k)).encode() + b":" + _encoded(v)
+                        for k, v in current._data.items()
+                    )
+                    + b"}"
+                )
+            else:
+                current._encoded = b"[" + b",".join(_encoded(v) for v in current._data) + b"]"
+            continue
+        stack.append((current, True))
+        children = current._data.values() if isinstance(current, FrozenDict) else current._data
+        for child in children:
+            if isinstance(child, (FrozenDict, FrozenList)) and child._encoded is None:
+                stack.append((child, False))
+    return node._encoded
+
+
+class CardDocument:
+    """
+    Immutable card document with path-copying edits.
+
+    Paths are tuples of dict keys and list indexes, e.g.
+    ``("items", 1, "columns", 0, "items")``.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: Any):
+        self.root = root
+
+    @classmethod
+    def from_obj(cls, obj: Any) -> "CardDocument":
+        """
+        Create a document from a card dict, element object or list.
+
+        Args:
+            obj: Card to freeze
+
+        Returns:
+            CardDocument instance
+        """
+        return cls(freeze(obj))
+
+    def get(self, path: Path, default: Any = None) -> Any:
+        """
+        Get the (frozen) value at ``path``.
+
+        Args:
+            path: Tuple of keys and indexes
+            default: Value returned when the path does not exist
+
+        Returns:
+            Value at path or default
+        """
+        node = self.root
+        try:
+            for key in path:
+                node = node[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return node
+
+    def set(self, path: Path, value: Any) -> "CardDocument":
+        """
+        Return a new document with ``value`` stored at ``path``.
+
+        Dict keys at the last path component may be new; list indexes must exist.
+
+        Args:
+            path: Tuple of keys and indexes
+            value: New value (frozen automatically)
+
+        Returns:
+            New CardDocument sharing all untouched subtrees
+        """
+        return CardDocument(self._assoc(path, lambda _old: freeze(value)))
+
+    def update(self, path: Path, fn: Callable[[Any], Any]) -> "CardDocument":
+        """
+        Return a new document with the value at ``path`` replaced by ``fn(old)``.
+
+        Args:
+            path: Tuple of keys and indexes
+            fn: Function receiving the current frozen value
+
+        Returns:
+            New CardDocument sharing all untouched subtrees
+        """
+        return CardDocument(self._assoc(path, lambda old: freeze(fn(old))))
+
+    def delete(self, path: Path) -> "CardDocument":
+        """
+        Return a new document without the key or list item at ``path``.
+
+        Args:
+            path: Tuple of keys and indexes (must not be empty)
+
+        Returns:
+            New CardDocument sharing all untouched subtrees
+        """
+        if not path:
+            raise ValueError("Cannot delete the document root")
+        parents = self._walk(path[:-1])
+        node = parents[-1]._remove(path[-1])
+        return CardDocument(self._rebuild(parents, path, node))
+
+    def to_dict(self) -> Any:
+        """Return the document as plain dicts and lists."""
+        return thaw(self.root)
+
+    def encode(self) -> bytes:
+        """Return the document as compact JSON bytes (cached per subtree)."""
+        return encode_node(self.root)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CardDocument):
+            return NotImplemented
+        return self.root is other.root or self.encode() == other.encode()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CardDocument({self.root!r})"
+
+    def _walk(self, path: Path) -> list:
+        nodes = [self.root]
+        for key in path:
+            nodes.append(nodes[-1][key])
+        return nodes
+
+    def _assoc(self, path: Path, make: Callable[[Any], Any]) -> Any:
+        if not path:
+            return make(self.root)
+        parents = self._walk(path[:-1])
+        last = path[-1]
+        parent = parents[-1]
+        old = parent.get(last) if isinstance(parent, FrozenDict) else parent[last]
+        node = parent._replace(last, make(old))
+        return self._rebuild(parents, path, node)
+
+    @staticmethod
+    def _rebuild(parents: list, path: Path, node: Any) -> Any:
+        for i in range(len(path) - 2, -1, -1):
+            node = parents[i]._replace(path[i], node)
+        return node
@@ -17,19 +17,30 @@ from msteamsadaptivecardbuilder import (
 )
 from typing import List, Dict, Any, Optional, Union
 
+from .instrumentation import instrumented
+from .text import TextNormalizer
 
-def text_block(text: str, **kwargs) -> TextBlock:
+
+@instrumented("elements.text_block")
+def text_block(
+    text: str, normalizer: Optional[TextNormalizer] = None, **kwargs
+) -> TextBlock:
+    if normalizer is not None:
+        text = normalizer(text)
     return TextBlock(text=text, **kwargs)
 
 
+@instrumented("elements.container")
 def container(items: List, **kwargs) -> Container:
     return Container(items=items, **kwargs)
 
 
+@instrumented("elements.column_set")
 def column_set(columns: List, **kwargs) -> ColumnSet:
     return ColumnSet(columns=columns, **kwargs)
 
 
+@instrumented("elements.column")
 def column(items: List, width: Optional[str] = None, **kwargs) -> Column:
     params = {"items": items}
     if width is not None:
@@ -38,15 +49,18 @@ def column(items: List, width: Optional[str] = None, **kwargs) -> Column:
     return Column(**params)
 
 
+@instrumented("elements.image")
 def image(url: str, **kwargs) -> Image:
     return Image(url=url, **kwargs)
 
 
+@instrumented("elements.fact_set")
 def fact_set(facts: List[dict], **kwargs) -> FactSet:
     fact_objs = [Fact(title=f["title"], value=f["value"]) for f in facts]
     return FactSet(facts=fact_objs, **kwargs)
 
 
+@instrumented("elements.action_set")
 def action_set(actions: List, **kwargs) -> ActionSet:
     return ActionSet(actions=actions, **kwargs)
 
@@ -54,6 +68,7 @@ def action_set(actions: List, **kwargs) -> ActionSet:
 # Input Elements
 
 
+@instrumented("elements.input_text")
 def input_text(
     id: str,
     placeholder: Optional[str] = None,
@@ -93,6 +108,7 @@ def input_text(
     return element
 
 
+@instrumented("elements.input_number")
 def input_number(
     id: str,
     placeholder: Optional[str] = None,
@@ -132,6 +148,7 @@ def input_number(
     return element
 
 
+@instrumented("elements.input_date")
 def input_date(
     id: str, placeholder: Optional[str] = None, value: Optional[str] = None, **kwargs
 ) -> Dict[str, Any]:
@@ -160,6 +177,7 @@ def input_date(
     return element
 
 
+@instrumented("elements.input_time")
 def input_time(
     id: str, placeholder: Optional[str] = None, value: Optional[str] = None, **kwargs
 ) -> Dict[str, Any]:
@@ -188,6 +206,7 @@ def input_time(
     return element
 
 
+@instrumented("elements.input_toggle")
 def input_toggle(
     id: str,
     title: str,
@@ -225,6 +244,7 @@ def input_toggle(
     return element
 
 
+@instrumented("elements.input_choice_set")
 def input_choice_set(
     id: str,
     choices: List[Dict[str, str]],
@@ -269,6 +289,7 @@ def input_choice_set(
 # Action Elements
 
 
+@instrumented("elements.action_submit")
 def action_submit(
     title: str, data: Optional[Dict[str, Any]] = None, **kwargs
 ) -> Dict[str, Any]:
@@ -294,6 +315,7 @@ def action_submit(
     return element
 
 
+@instrumented("elements.action_open_url")
 def action_open_url(title: str, url: str, **kwargs) -> Dict[str, Any]:
     """
     Create an Action.OpenUrl element.
@@ -311,6 +333,7 @@ def action_open_url(title: str, url: str, **kwargs) -> Dict[str, Any]:
     return element
 
 
+@instrumented("elements.action_show_card")
 def action_show_card(title: str, card: Dict[str, Any], **kwargs) -> Dict[str, Any]:
     """
     Create an Action.ShowCard element.
@@ -328,30 +351,111 @@ def action_show_card(title: str, card: Dict[str, Any], **kwargs) -> Dict[str, An
     return element
 
 
+SHARED_DATA_KEY = "sharedData"
+SHARED_DATA_KEYS_KEY = "sharedDataKeys"
+
+
+@instrumented("elements.qlik_chart")
 def qlik_chart(
-    chart: Dict[str, Any], alternativeChartTypes: List[Dict[str, Any]], **kwargs
+    chart: Dict[str, Any],
+    alternativeChartTypes: List[Dict[str, Any]],
+    expand: bool = False,
+    **kwargs,
 ) -> Dict[str, Any]:
     """
     Create an Qlik.Chart element.
 
+    Data properties (dicts and lists, e.g. the hypercube) that the primary chart
+    shares with its alternatives are stored once in ``sharedData``; each chart
+    type lists the properties it takes from there in ``sharedDataKeys``.
+
     Args:
-        chart: Action title
-        alternativeChartTypes: Card to show
+        chart: Primary chart definition (must contain ``chartType``)
+        alternativeChartTypes: Alternative chart definitions
+        expand: Keep every chart's data inline (legacy shape)
         **kwargs: Additional properties
 
     Returns:
         Qlik.Chart element dictionary
     """
+    if not expand and alternativeChartTypes:
+        chart, alternativeChartTypes, shared = _share_chart_data(chart, alternativeChartTypes)
+    else:
+        shared = None
     element = {
         "type": "Qlik.Chart",
         "chart": chart,
         "defaultChartType": chart["chartType"],
         "alternativeChartTypes": alternativeChartTypes,
     }
+    if shared:
+        element[SHARED_DATA_KEY] = shared
     element.update(kwargs)
     return element
 
 
+def _share_chart_data(chart: Dict[str, Any], alternatives: List[Dict[str, Any]]):
+    """Factor data properties shared by the primary chart and its alternatives."""
+    shared = {}
+    for key, value in chart.items():
+        if key == "chartType" or not isinstance(value, (dict, list)):
+            continue
+        if any(
+            isinstance(alt, dict) and key in alt and (alt[key] is value or alt[key] == value)
+            for alt in alternatives
+        ):
+            shared[key] = value
+    if not shared:
+        return chart, alternatives, None
+
+    def factor(definition):
+        if not isinstance(definition, dict):
+            return definition
+        keys = [
+            key
+            for key, value in shared.items()
+            if key in definition and (definition[key] is value or definition[key] == value)
+        ]
+        if not keys:
+            return definition
+        factored = {k: v for k, v in definition.items() if k not in keys}
+        factored[SHARED_DATA_KEYS_KEY] = keys
+        return factored
+
+    return factor(chart), [factor(alt) for alt in alternatives], shared
+
+
+def expand_chart_data(element: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a Qlik.Chart element with shared data back to the legacy inline shape.
+
+    Args:
+        element: Qlik.Chart element dictionary
+
+    Returns:
+        Element with every chart type carrying its own data (the input if it has no shared data)
+    """
+    shared = element.get(SHARED_DATA_KEY)
+    if not shared:
+        return element
+
+    def inline(definition):
+        if not isinstance(definition, dict) or SHARED_DATA_KEYS_KEY not in definition:
+            return definition
+        expanded = {k: v for k, v in definition.items() if k != SHARED_DATA_KEYS_KEY}
+        for key in definition[SHARED_DATA_KEYS_KEY]:
+            expanded[key] = shared[key]
+        return expanded
+
+    expanded = {k: v for k, v in element.items() if k != SHARED_DATA_KEY}
+    expanded["chart"] = inline(element["chart"])
+    expanded["alternativeChartTypes"] = [
+        inline(alt) for alt in element.get("alternativeChartTypes", [])
+    ]
+    return expanded
+
+
+@instrumented("elements.qlik_skeleton")
 def qlik_skeleton(
     variant: str,
     width: str | None = None,
@@ -378,6 +482,7 @@ def qlik_skeleton(
     return element
 
 
+@instrumented("elements.qlik_tag")
 def qlik_tag(
     text: str,
     size: str,
@@ -399,6 +504,7 @@ def qlik_tag(
     return element
 
 
+@instrumented("elements.action_show_modal")
 def action_show_modal(
     iconUrl: str,
     title: str | None = None,
@@ -429,6 +535,7 @@ def action_show_modal(
     return element
 
 
+@instrumented("elements.action_toggle_visibility")
 def action_toggle_visibility(
     title: str, targetElements: List[str], **kwargs
 ) -> Dict[str, Any]:
@@ -449,12 +556,14 @@ def action_toggle_visibility(
     return element
 
 
+@instrumented("elements.action_menu_dropdown")
 def action_menu_dropdown(title: str, **kwargs) -> Dict[str, Any]:
     element = {"type": "Action.MenuDropdown", "title": title}
     element.update(kwargs)
     return element
 
 
+@instrumented("elements.action_execute")
 def action_execute(
     title: str, sheetID: str, sheetIcon: str, **kwargs
 ) -> Dict[str, Any]:
@@ -0,0 +1,205 @@
+"""
+Card serialization with a bounded cache of encoded subtrees.
+
+Frozen fragments (``FrozenDict``/``FrozenList`` from ``documents``) are
+keyed by object identity, and their compact JSON bytes are kept in a
+bounded LRU shared across serializations. Plain dicts and lists are encoded by
+the C JSON encoder; frozen fragments inside them are spliced in as cached bytes.
+
+Fingerprinting a plain subtree by content costs about as much as encoding it,
+so content hashing happens once, when a fragment is interned: ``intern()``
+encodes the fragment, maps equal encoded content to one canonical frozen
+fragment, and every later card then hits it by identity.
+
+Example:
+    cache = FragmentCache()
+    buttons = cache.intern(aaa.create_buttons(...))
+    payload = encode_card({"type": "AdaptiveCard", "body": [top_bar, buttons]}, cache)
+    print(cache.stats())
+"""
+
+import hashlib
+import json
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .documents import FrozenDict, FrozenList, encode_node, freeze
+from .utils import _recursive_render
+
+
+def _unwrap(o: Any) -> Any:
+    if isinstance(o, FrozenDict):
+        return o._data
+    if isinstance(o, FrozenList):
+        return list(o._data)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _encode_owned(node: Any) -> bytes:
+    """Encode a frozen fragment without filling the per-node caches of its subtree."""
+    if node._encoded is not None:
+        return node._encoded
+    return json.dumps(node, separators=(",", ":"), default=_unwrap).encode()
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of encoded fragment bytes, bounded by entries and bytes.
+
+    Each cached fragment takes one entry, keyed by identity and pinning the
+    fragment. The cache owns the encoded bytes it holds (it does not fill the
+    fragments' own per-node caches), so ``max_bytes`` and ``stats()["bytes"]``
+    cover every encoded byte it keeps alive.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # id(node) -> (pinned node, encoded bytes, content digest if interned)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # content digest -> id of the canonical interned fragment
+        self._interned: Dict[bytes, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def encoded(self, node: Any) -> bytes:
+        """
+        Get the encoded bytes of a frozen fragment, encoding it on a miss.
+
+        Args:
+            node: FrozenDict or FrozenList
+
+        Returns:
+            Compact JSON bytes
+        """
+        key = id(node)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is node:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        data = _encode_owned(node)
+        self._store(node, data, None)
+        return data
+
+    def intern(self, obj: Any) -> Any:
+        """
+        Return the canonical frozen fragment for the content of ``obj``.
+
+        Args:
+            obj: Card fragment (element object, dict, list or frozen node)
+
+        Returns:
+            FrozenDict/FrozenList shared by every fragment with equal content
+        """
+        rendered = _recursive_render(obj)
+        data = encode_card(rendered, self)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            key = self._interned.get(digest)
+            if key is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        return self._store(freeze(rendered), data, digest)
+
+    def _store(self, node: Any, data: bytes, digest: Optional[bytes]) -> Any:
+        """Add an entry and evict down to the bounds; returns the canonical node."""
+        with self._lock:
+            if digest is not None:
+                key = self._interned.get(digest)
+                if key is not None:  # interned concurrently by another thread
+                    return self._entries[key][0]
+            key = id(node)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._drop(key, old)
+            self._entries[key] = (node, data, digest)
+            self._bytes += len(data)
+            if digest is not None:
+                self._interned[digest] = key
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._drop(evicted_key, evicted)
+                self.evictions += 1
+            return node
+
+    def _drop(self, key: int, entry: tuple) -> None:
+        self._bytes -= len(entry[1])
+        if entry[2] is not None and self._interned.get(entry[2]) == key:
+            del self._interned[entry[2]]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries, bytes (encoded
+            bytes held by the cache) and evictions
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._interned.clear()
+            self._bytes = 0
+
+
+_MARKER = "\x00acb" + secrets.token_hex(8) + ":"
+_MARKER_RE = re.compile(re.escape(json.dumps(_MARKER)[:-1]) + r'(\d+)"')
+
+
+def encode_card(card: Any, cache: Optional[FragmentCache] = None) -> bytes:
+    """
+    Encode a card as compact JSON bytes, reusing cached fragment bytes.
+
+    Args:
+        card: Card, element, dict, list or frozen fragment
+        cache: Fragment cache (frozen fragments use their own per-node cache if None)
+
+    Returns:
+        UTF-8 bytes equal to ``json.dumps(card, separators=(",", ":"))``
+    """
+    rendered = _recursive_render(card)
+    lookup = cache.encoded if cache is not None else encode_node
+    if isinstance(rendered, (FrozenDict, FrozenList)):
+        return lookup(rendered)
+
+    fragments = []
+
+    def default(o):
+        if isinstance(o, (FrozenDict, FrozenList)):
+            fragments.append(o)
+            return f"{_MARKER}{len(fragments) - 1}"
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    text = json.dumps(rendered, separators=(",", ":"), default=default)
+    if not fragments:
+        return text.encode()
+    parts = _MARKER_RE.split(text)
+    out = bytearray(parts[0].encode())
+    for i in range(1, len(parts), 2):
+        out += lookup(fragments[int(parts[i])])
+        out += parts[i + 1].encode()
+    return bytes(out)
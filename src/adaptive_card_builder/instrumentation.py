@@ -0,0 +1,338 @@
+"""
+Hot-path instrumentation for card construction.
+
+Records wall time, CPU time and the net change in allocated memory blocks for
+each stage of card creation (element construction, ``to_dict``, rendering,
+JSON encoding and the ``AAACards`` methods) and forwards them to a pluggable
+sink. The block delta is what a stage leaves allocated, not how many
+allocations it made: it is negative when a stage frees more than it keeps
+(e.g. when a garbage collection runs inside it).
+
+Instrumentation is disabled by default, and disabled instrumentation costs
+nothing: ``@instrumented`` only registers a function. ``enable()`` installs the
+measuring wrappers in the package's module and class namespaces (``elements``,
+``utils``, ``AAACards``, and modules that imported those functions by name)
+and ``disable()`` puts the original functions back. Code outside the package
+that imported an element function by name before ``enable()`` keeps calling
+the unwrapped function; call it through its module to have it measured.
+
+Example:
+    from adaptive_card_builder import instrumentation
+
+    sink = instrumentation.InMemorySink()
+    instrumentation.enable(sink)
+    ...
+    print(sink.snapshot())
+    instrumentation.disable()
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the wall-time histogram buckets.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+
+_sink = None
+
+# Functions registered by @instrumented: (function, stage name).
+_registry: List[Tuple[Callable, str]] = []
+# id(wrapper) -> (wrapper, original) for the wrappers currently installed.
+_installed: Dict[int, Tuple[Callable, Callable]] = {}
+_install_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StageSample:
+    """A single measurement of one stage invocation."""
+
+    stage: str
+    wall: float
+    cpu: float
+    net_blocks: int
+
+
+@dataclass
+class StageStats:
+    """Aggregated counters and wall-time histogram for one stage."""
+
+    count: int = 0
+    wall_total: float = 0.0
+    cpu_total: float = 0.0
+    net_blocks_total: int = 0
+    wall_max: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(DEFAULT_BUCKETS))
+
+    def add(self, sample: StageSample) -> None:
+        self.count += 1
+        self.wall_total += sample.wall
+        self.cpu_total += sample.cpu
+        self.net_blocks_total += sample.net_blocks
+        if sample.wall > self.wall_max:
+            self.wall_max = sample.wall
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if sample.wall <= bound:
+                self.buckets[i] += 1
+                break
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "wall_total": self.wall_total,
+            "cpu_total": self.cpu_total,
+            "net_blocks_total": self.net_blocks_total,
+            "wall_max": self.wall_max,
+            "buckets": dict(zip(DEFAULT_BUCKETS, self.buckets)),
+        }
+
+
+class InMemorySink:
+    """Aggregates samples per stage in memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, StageStats] = {}
+
+    def record(self, sample: StageSample) -> None:
+        with self._lock:
+            stats = self._stats.get(sample.stage)
+            if stats is None:
+                stats = self._stats[sample.stage] = StageStats()
+            stats.add(sample)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a copy of the aggregated statistics.
+
+        Returns:
+            Dictionary mapping stage name to its counters and histogram
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class PrometheusFileSink(InMemorySink):
+    """
+    Aggregates samples in memory and writes them in Prometheus text format.
+
+    Call ``flush()`` to (atomically) rewrite the file, e.g. from a node
+    exporter textfile collector schedule.
+    """
+
+    def __init__(self, path: str, prefix: str = "adaptive_card_builder"):
+        super().__init__()
+        self.path = path
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Render the current statistics in Prometheus exposition format.
+
+        Returns:
+            Prometheus text format string
+        """
+        p = self.prefix
+        lines = [
+            f"# TYPE {p}_stage_calls_total counter",
+            f"# TYPE {p}_stage_cpu_seconds_total counter",
+            f"# TYPE {p}_stage_net_blocks gauge",
+            f"# TYPE {p}_stage_wall_seconds histogram",
+        ]
+        for name, stats in sorted(self.snapshot().items()):
+            label = f'stage="{name}"'
+            lines.append(f"{p}_stage_calls_total{{{label}}} {stats['count']}")
+            lines.append(f"{p}_stage_cpu_seconds_total{{{label}}} {stats['cpu_total']}")
+            lines.append(f"{p}_stage_net_blocks{{{label}}} {stats['net_blocks_total']}")
+            cumulative = 0
+            for bound, n in stats["buckets"].items():
+                cumulative += n
+                lines.append(
+                    f'{p}_stage_wall_seconds_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'{p}_stage_wall_seconds_bucket{{{label},le="+Inf"}} {stats["count"]}'
+            )
+            lines.append(f"{p}_stage_wall_seconds_sum{{{label}}} {stats['wall_total']}")
+            lines.append(f"{p}_stage_wall_seconds_count{{{label}}} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Write the current statistics to ``path``."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
+
+
+class CallbackSink:
+    """Forwards every sample to a user supplied callable."""
+
+    def __init__(self, callback: Callable[[StageSample], None]):
+        self.callback = callback
+
+    def record(self, sample: StageSample) -> None:
+        self.callback(sample)
+
+
+def enable(sink) -> None:
+    """
+    Enable instrumentation.
+
+    Args:
+        sink: Object with a ``record(sample)`` method. If it also has an
+            ``on_call(stage, args, kwargs)`` method, that is invoked with the
+            arguments of every instrumented function call before it runs.
+    """
+    global _sink
+    _sink = sink
+    with _install_lock:
+        if not _installed:
+            wrappers = {}
+            for fn, stage_name in _registry:
+                wrapper = _wrap(fn, stage_name)
+                wrappers[id(fn)] = (fn, wrapper)
+                _installed[id(wrapper)] = (wrapper, fn)
+            _rebind(wrappers)
+
+
+def disable() -> None:
+    """Disable instrumentation and restore the unwrapped functions."""
+    global _sink
+    with _install_lock:
+        _rebind({key: (wrapper, fn) for key, (wrapper, fn) in _installed.items()})
+        _installed.clear()
+    _sink = None
+
+
+def _namespaces():
+    """Modules of this package and the classes they define."""
+    package = __name__.rpartition(".")[0]
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not (module_name == package or module_name.startswith(package + ".")):
+            continue
+        yield module
+        for value in list(vars(module).values()):
+            if isinstance(value, type) and value.__module__ == module_name:
+                yield value
+
+
+def _rebind(replacements: Dict[int, Tuple[Callable, Callable]]) -> None:
+    """Replace every binding of ``old`` with ``new``, for id(old) -> (old, new)."""
+    for namespace in _namespaces():
+        for attr, value in list(vars(namespace).items()):
+            entry = replacements.get(id(value))
+            if entry is not None and entry[0] is value:
+                setattr(namespace, attr, entry[1])
+
+
+def is_enabled() -> bool:
+    return _sink is not None
+
+
+def get_sink():
+    return _sink
+
+
+class _Stage:
+    __slots__ = ("name", "sink", "wall", "cpu", "blocks")
+
+    def __init__(self, name: str, sink):
+        self.name = name
+        self.sink = sink
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        net_blocks = sys.getallocatedblocks() - self.blocks
+        self.sink.record(StageSample(self.name, wall, cpu, net_blocks))
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """
+    Context manager measuring the enclosed block as stage ``name``.
+
+    Stages nest; timings are inclusive of any nested stages.
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Context manager (a shared no-op one when instrumentation is disabled)
+    """
+    sink = _sink
+    if sink is None:
+        return _NULL_STAGE
+    return _Stage(name, sink)
+
+
+def instrumented(name: Optional[str] = None):
+    """
+    Decorator registering a function to be measured as a stage while enabled.
+
+    The function itself is returned unchanged; ``enable()`` installs the
+    measuring wrapper wherever the package binds it.
+
+    Args:
+        name: Stage name (defaults to the function's qualified name)
+    """
+
+    def decorator(fn):
+        _registry.append((fn, name or fn.__qualname__))
+        return fn
+
+    return decorator
+
+
+def _wrap(fn: Callable, stage_name: str) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        sink = _sink
+        if sink is None:
+            return fn(*args, **kwargs)
+        on_call = getattr(sink, "on_call", None)
+        if on_call is not None:
+            on_call(stage_name, args, kwargs)
+        with _Stage(stage_name, sink):
+            return fn(*args, **kwargs)
+
+    return wrapper
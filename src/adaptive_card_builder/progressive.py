@@ -0,0 +1,181 @@
+"""
+Progressive assembly of App Analysis Agent cards.
+
+The card starts as ``AAACards.create_skeleton()`` and each skeleton slot is
+replaced by its section (top bar, chart, buttons) as soon as that section's
+input arrives from upstream. Sections are built concurrently, every
+intermediate state is emitted immediately, and each section is encoded exactly
+once; emitted states are assembled from the cached section bytes.
+
+Example:
+    inputs = {
+        "top_bar": pool.submit(fetch_top_bar_kwargs),
+        "chart": pool.submit(fetch_chart_kwargs),
+        "buttons": {"add_to_sheet": True, "sheet_list_actions": [], ...},
+    }
+    for update in assemble(inputs):
+        send(update.encoded)
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional
+
+from .cards import AAACards
+from .encoding import encode_card
+
+# Section name -> (skeleton slot, AAACards method)
+SECTIONS = {
+    "top_bar": (0, "create_top_bar"),
+    "chart": (1, "create_chart"),
+    "buttons": (2, "create_buttons"),
+}
+
+
+class CardUpdate(NamedTuple):
+    """One emitted card state."""
+
+    section: str
+    body: List[Any]
+    encoded: bytes
+    complete: bool
+
+
+class _Assembly:
+    """Card body state with one cached encoding per slot."""
+
+    def __init__(self, cards: AAACards, sections):
+        self.cards = cards
+        self.pending = set(sections)
+        self.body = list(cards.create_skeleton())
+        self.encoded = [encode_card(part) for part in self.body]
+
+    def build(self, section: str, kwargs: Dict[str, Any]):
+        slot, method = SECTIONS[section]
+        part = getattr(self.cards, method)(**kwargs)
+        return section, slot, part, encode_card(part)
+
+    def apply(self, section: str, slot: int, part: Any, encoded: bytes) -> CardUpdate:
+        self.body[slot] = part
+        self.encoded[slot] = encoded
+        self.pending.discard(section)
+        return self.update(section)
+
+    def update(self, section: str) -> CardUpdate:
+        return CardUpdate(
+            section,
+            list(self.body),
+            b"[" + b",".join(self.encoded) + b"]",
+            not self.pending,
+        )
+
+
+def _check_sections(inputs: Dict[str, Any]) -> None:
+    unknown = set(inputs) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown card sections: {', '.join(sorted(unknown))}")
+
+
+def assemble(
+    inputs: Dict[str, Any],
+    cards: Optional[AAACards] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[CardUpdate]:
+    """
+    Assemble a card progressively from per-section inputs.
+
+    Args:
+        inputs: Section name ("top_bar", "chart", "buttons") mapped to a
+            ``concurrent.futures.Future`` resolving to the keyword arguments of
+            the section's ``AAACards`` method, or to those arguments directly
+        cards: AAACards instance (a new one if None)
+        executor: Executor building sections (a private thread pool if None)
+
+    Yields:
+        CardUpdate for the skeleton, then one per section in completion order
+    """
+    _check_sections(inputs)
+    state = _Assembly(cards or AAACards(), inputs)
+    yield state.update("skeleton")
+    if not inputs:
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=len(inputs))
+    try:
+        builds = []
+        for section, source in inputs.items():
+            if isinstance(source, Future):
+                build: Future = Future()
+                source.add_done_callback(
+                    lambda f, section=section, build=build: _chain(
+                        executor, state, section, f, build
+                    )
+                )
+            else:
+                build = executor.submit(state.build, section, source)
+            builds.append(build)
+        for build in as_completed(builds):
+            yield state.apply(*build.result())
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _chain(executor: Executor, state: _Assembly, section: str, source: Future, build: Future):
+    """Start building ``section`` once its input future has resolved."""
+    try:
+        inner = executor.submit(state.build, section, source.result())
+    except BaseException as exc:
+        build.set_exception(exc)
+        return
+
+    def done(f: Future) -> None:
+        if f.exception() is not None:
+            build.set_exception(f.exception())
+        else:
+            build.set_result(f.result())
+
+    inner.add_done_callback(done)
+
+
+async def assemble_async(
+    inputs: Dict[str, Any],
+    cards: Optional[AAACards] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[CardUpdate]:
+    """
+    Async version of ``assemble``.
+
+    Sections are built and encoded in ``executor``, off the event loop, so
+    they overlap with each other and with the loop's other work.
+
+    Args:
+        inputs: Section name mapped to an awaitable resolving to the keyword
+            arguments of the section's ``AAACards`` method, or to those
+            arguments directly
+        cards: AAACards instance (a new one if None)
+        executor: Executor building sections (the loop's default executor if None)
+
+    Yields:
+        CardUpdate for the skeleton, then one per section in completion order
+    """
+    _check_sections(inputs)
+    state = _Assembly(cards or AAACards(), inputs)
+    yield state.update("skeleton")
+
+    loop = asyncio.get_running_loop()
+
+    async def build(section: str, source: Any):
+        kwargs = await source if inspect.isawaitable(source) else source
+        return await loop.run_in_executor(executor, state.build, section, kwargs)
+
+    tasks = [asyncio.ensure_future(build(s, src)) for s, src in inputs.items()]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield state.apply(*(await task))
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,320 @@
+"""
+Record-and-replay load testing for card generation.
+
+``Recorder`` captures the arguments of top-level calls to ``AAACards``
+methods and the element functions (via the instrumentation hooks) into a
+compact on-disk corpus. ``replay`` drives a corpus against the library at a
+configurable rate and concurrency and reports throughput, latency
+percentiles, RSS growth and GC pauses.
+
+Capture in production:
+    with Recorder("cards.acbr"):
+        serve_requests()
+
+Replay offline:
+    python -m adaptive_card_builder.replay cards.acbr --rate 500 --concurrency 4
+"""
+
+import argparse
+import gc
+import json
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import binary, elements, instrumentation, utils
+from .cards import AAACards
+from .deferred import DeferredStore
+from .text import TextNormalizer
+
+_length = struct.Struct("<I")
+
+# Key of the dict recorded in place of a known non-data argument.
+MARKER_KEY = "$replay"
+
+
+def _marker(obj: Any) -> Dict[str, Any]:
+    """Record helpers passed as arguments by their configuration."""
+    if isinstance(obj, TextNormalizer):
+        return {MARKER_KEY: "TextNormalizer", **obj.config}
+    if isinstance(obj, DeferredStore):
+        return {MARKER_KEY: "DeferredStore", "max_entries": obj.max_entries}
+    return vars(obj)
+
+
+def _plain(obj: Any) -> Any:
+    """Convert captured arguments (which may contain element objects) to plain data."""
+    return json.loads(json.dumps(utils._recursive_render(obj), default=_marker))
+
+
+def _restore(value: Any, helpers: Dict[tuple, Any]) -> Any:
+    """Replace a recorded marker with a helper, shared by calls with the same configuration."""
+    if not (isinstance(value, dict) and MARKER_KEY in value):
+        return value
+    config = {k: v for k, v in value.items() if k != MARKER_KEY}
+    key = (value[MARKER_KEY], tuple(sorted(config.items())))
+    if key not in helpers:
+        factory = {"TextNormalizer": TextNormalizer, "DeferredStore": DeferredStore}[value[MARKER_KEY]]
+        helpers[key] = factory(**config)
+    return helpers[key]
+
+
+class Recorder:
+    """
+    Instrumentation sink capturing top-level card-building calls to a corpus.
+
+    Calls made from inside another instrumented call (e.g. the element
+    functions used by ``create_buttons``) are not recorded, so replaying the
+    corpus reproduces the original work once. Element objects passed as
+    arguments are recorded in their dict form, and ``TextNormalizer`` /
+    ``DeferredStore`` arguments as markers recreated on replay. Calls with
+    other arguments that cannot be serialized are counted in ``skipped``
+    (stage -> count) rather than recorded.
+
+    Args:
+        path: Corpus file (appended to)
+        sink: Optional sink to forward timing samples to
+    """
+
+    def __init__(self, path: str, sink=None):
+        self.path = path
+        self.sink = sink
+        self.count = 0
+        self.skipped: Dict[str, int] = {}
+        self._file = None
+        self._previous = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def on_call(self, stage: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+        calls = getattr(self._local, "calls", None)
+        if calls is None:
+            calls = self._local.calls = []
+        calls.append(stage)
+        if len(calls) > 1:
+            return
+        if stage.startswith("AAACards."):
+            args = args[1:]
+        try:
+            payload = binary.dumps([stage, _plain(list(args)), _plain(kwargs)])
+        except (TypeError, ValueError):
+            with self._lock:
+                self.skipped[stage] = self.skipped.get(stage, 0) + 1
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.write(_length.pack(len(payload)))
+                self._file.write(payload)
+                self.count += 1
+
+    def record(self, sample) -> None:
+        calls = getattr(self._local, "calls", None)
+        if calls and calls[-1] == sample.stage:
+            calls.pop()
+        if self.sink is not None:
+            self.sink.record(sample)
+
+    def start(self) -> "Recorder":
+        self._file = open(self.path, "ab")
+        self._previous = instrumentation.get_sink()
+        instrumentation.enable(self)
+        return self
+
+    def stop(self) -> None:
+        if self._previous is not None:
+            instrumentation.enable(self._previous)
+        else:
+            instrumentation.disable()
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Recorder":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def read_corpus(path: str) -> Iterator[Tuple[str, list, Dict[str, Any]]]:
+    """
+    Read a recorded corpus.
+
+    Args:
+        path: Corpus file
+
+    Yields:
+        (stage, args, kwargs) tuples
+    """
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_length.size)
+            if len(header) < _length.size:
+                return
+            (size,) = _length.unpack(header)
+            stage, args, kwargs = binary.loads(f.read(size))
+            yield stage, args, kwargs
+
+
+def _resolve(stage: str, cards: AAACards) -> Optional[Callable]:
+    owner, _, name = stage.partition(".")
+    target = {"AAACards": cards, "elements": elements, "utils": utils}.get(owner)
+    return getattr(target, name, None) if target is not None else None
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        # Peak rather than current RSS (reported in kilobytes).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _GCTimer:
+    """Collects GC pause durations via ``gc.callbacks``."""
+
+    def __init__(self):
+        self.pauses: List[float] = []
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._start)
+
+    def __enter__(self) -> "_GCTimer":
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        gc.callbacks.remove(self)
+
+
+def replay(
+    path: str,
+    rate: Optional[float] = None,
+    concurrency: int = 1,
+    loops: int = 1,
+    duration: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Drive a recorded corpus against the library.
+
+    Args:
+        path: Corpus file
+        rate: Target calls per second (as fast as possible if None)
+        concurrency: Number of threads issuing calls
+        loops: Number of passes over the corpus
+        duration: Stop after this many seconds
+
+    Returns:
+        Report with calls, errors, skipped, elapsed, throughput, latency
+        percentiles (seconds), RSS growth and GC pause statistics
+    """
+    cards = AAACards()
+    calls = []
+    skipped = 0
+    helpers: Dict[tuple, Any] = {}
+    for stage, args, kwargs in read_corpus(path):
+        fn = _resolve(stage, cards)
+        if fn is None:
+            skipped += 1
+        else:
+            args = [_restore(arg, helpers) for arg in args]
+            kwargs = {key: _restore(value, helpers) for key, value in kwargs.items()}
+            calls.append((fn, args, kwargs))
+    work = calls * loops
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    next_index = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def worker() -> None:
+        nonlocal next_index, errors
+        local: List[float] = []
+        local_errors = 0
+        while True:
+            with lock:
+                index = next_index
+                next_index += 1
+            if index >= len(work):
+                break
+            if rate:
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            fn, args, kwargs = work[index]
+            t0 = time.perf_counter()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                local_errors += 1
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    rss_start = _rss_bytes()
+    with _GCTimer() as gc_timer:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+    elapsed = time.perf_counter() - start
+    rss_end = _rss_bytes()
+
+    latencies.sort()
+    pauses = gc_timer.pauses
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "skipped": skipped,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": {
+            "p50": _percentile(latencies, 0.50),
+            "p90": _percentile(latencies, 0.90),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "rss": {"start": rss_start, "end": rss_end, "growth": rss_end - rss_start},
+        "gc": {
+            "pauses": len(pauses),
+            "total": sum(pauses),
+            "max": max(pauses) if pauses else 0.0,
+        },
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded card-building corpus")
+    parser.add_argument("corpus")
+    parser.add_argument("--rate", type=float, help="Target calls per second")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--loops", type=int, default=1)
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    args = parser.parse_args(argv)
+    report = replay(args.corpus, args.rate, args.concurrency, args.loops, args.duration)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Inbound action routing.
+
+Cards built here send back ``Action.Execute`` invokes (``addToNewSheet`` from
+``menuList``), ``Action.ToggleVisibility`` callbacks (``elaborate`` from
+``create_buttons``) and ``Action.Submit`` data carrying input values.
+``ActionRouter`` compiles the routes once into a dispatch table keyed by verb,
+and ``PayloadSchema`` compiles the card's input elements (``input_text``,
+``input_number``, ``input_choice_set``, ...) into typed decoders that check
+the original constraints (``maxLength``, ``min``/``max``, ``regex``, choices,
+``isRequired``). Dispatching a callback is then a dict lookup plus one decoder
+call per input; the card itself is never parsed again.
+
+Example:
+    router = ActionRouter()
+    router.register("addToNewSheet", add_to_sheet)
+    router.register("submitFeedback", save_feedback, schema=PayloadSchema.from_card(card))
+    result = router.dispatch(activity.value)
+"""
+
+import re
+from datetime import date, time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .utils import to_dict
+
+# A decoder receives the raw submitted value (None if absent) and returns the
+# typed value, raising ValueError with a message if it is invalid.
+Decoder = Callable[[Any], Any]
+# A handler receives the decoded data and the raw inbound payload.
+Handler = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+VERB_KEY = "verb"
+
+
+class ValidationError(ValueError):
+    """
+    Raised when submitted input values violate their input's constraints.
+
+    Attributes:
+        errors: Input id -> error message
+    """
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(f"{key}: {message}" for key, message in errors.items()))
+        self.errors = errors
+
+
+def _blank(raw: Any) -> bool:
+    return raw is None or raw == ""
+
+
+def _text_decoder(element: Dict[str, Any]) -> Decoder:
+    max_length = element.get("maxLength")
+    pattern = re.compile(element["regex"]) if element.get("regex") else None
+
+    def decode(raw: Any) -> Optional[str]:
+        if _blank(raw):
+            return None
+        text = str(raw)
+        if max_length and len(text) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        if pattern is not None and not pattern.fullmatch(text):
+            raise ValueError("does not match the expected format")
+        return text
+
+    return decode
+
+
+def _number_decoder(element: Dict[str, Any]) -> Decoder:
+    low = element.get("min")
+    high = element.get("max")
+
+    def decode(raw: Any) -> Optional[float]:
+        if _blank(raw):
+            return None
+        if isinstance(raw, bool):
+            raise ValueError("not a number")
+        if isinstance(raw, (int, float)):
+            number = raw
+        else:
+            try:
+                number = float(raw)
+            except (TypeError, ValueError):
+                raise ValueError("not a number") from None
+            if number.is_integer() and "." not in str(raw):
+                number = int(number)
+        if number != number:
+            raise ValueError("not a number")
+        if low is not None and number < low:
+            raise ValueError(f"less than {low}")
+        if high is not None and number > high:
+            raise ValueError(f"greater than {high}")
+        return number
+
+    return decode
+
+
+def _temporal_decoder(element: Dict[str, Any], parse: Callable[[str], Any], kind: str) -> Decoder:
+    low = parse(element["min"]) if element.get("min") else None
+    high = parse(element["max"]) if element.get("max") else None
+
+    def decode(raw: Any) -> Any:
+        if _blank(raw):
+            return None
+        try:
+            value = parse(str(raw))
+        except ValueError:
+            raise ValueError(f"not a valid {kind}") from None
+        if low is not None and value < low:
+            raise ValueError(f"earlier than {element['min']}")
+        if high is not None and value > high:
+            raise ValueError(f"later than {element['max']}")
+        return value
+
+    return decode
+
+
+def _toggle_decoder(element: Dict[str, Any]) -> Decoder:
+    value_on = element.get("valueOn", "true")
+    value_off = element.get("valueOff", "false")
+
+    def decode(raw: Any) -> Optional[bool]:
+        if _blank(raw):
+            return None
+        text = str(raw).lower() if isinstance(raw, bool) else str(raw)
+        if text == value_on:
+            return True
+        if text == value_off:
+            return False
+        raise ValueError(f"expected {value_on!r} or {value_off!r}")
+
+    return decode
+
+
+def _choice_set_decoder(element: Dict[str, Any]) -> Decoder:
+    allowed = frozenset(str(choice.get("value")) for choice in element.get("choices") or [])
+    multi = bool(element.get("isMultiSelect"))
+    # Typeahead choice sets may accept values outside the static list.
+    open_ended = element.get("choices.data") is not None
+
+    def check(value: str) -> str:
+        if not open_ended and value not in allowed:
+            raise ValueError(f"{value!r} is not one of the choices")
+        return value
+
+    def decode(raw: Any) -> Any:
+        if _blank(raw):
+            return None
+        if multi:
+            values = raw if isinstance(raw, list) else str(raw).split(",")
+            return [check(str(value)) for value in values if value != ""]
+        return check(str(raw))
+
+    return decode
+
+
+# Input element type -> decoder factory.
+DECODERS: Dict[str, Callable[[Dict[str, Any]], Decoder]] = {
+    "Input.Text": _text_decoder,
+    "Input.Number": _number_decoder,
+    "Input.Date": lambda element: _temporal_decoder(element, date.fromisoformat, "date"),
+    "Input.Time": lambda element: _temporal_decoder(element, time.fromisoformat, "time"),
+    "Input.Toggle": _toggle_decoder,
+    "Input.ChoiceSet": _choice_set_decoder,
+}
+
+
+class PayloadSchema:
+    """
+    Compiled decoders for the inputs of one card.
+
+    Args:
+        inputs: Input element dictionaries (as built by the ``input_*`` functions)
+    """
+
+    def __init__(self, inputs: Iterable[Dict[str, Any]] = ()):
+        self._fields: Dict[str, Tuple[Decoder, bool]] = {}
+        for element in inputs:
+            factory = DECODERS.get(element.get("type"))
+            if factory is None or "id" not in element:
+                continue
+            self._fields[element["id"]] = (factory(element), bool(element.get("isRequired")))
+
+    @classmethod
+    def from_card(cls, card: Any) -> "PayloadSchema":
+        """
+        Compile the schema of every input element in a card.
+
+        Args:
+            card: Card, element, dict or list
+
+        Returns:
+            PayloadSchema for the card's inputs
+        """
+        inputs = []
+        stack = [to_dict(card)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if node.get("type") in DECODERS:
+                    inputs.append(node)
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+        return cls(inputs)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(self._fields)
+
+    def decode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decode and validate submitted data.
+
+        Keys that are not inputs of the card are passed through unchanged.
+
+        Args:
+            data: Submitted data (input id -> raw value)
+
+        Returns:
+            Data with input values replaced by their typed values
+
+        Raises:
+            ValidationError: If any input value is missing or invalid
+        """
+        decoded = dict(data)
+        errors = None
+        for key, (decode, required) in self._fields.items():
+            try:
+                value = decode(data.get(key))
+                if value is None and required:
+                    raise ValueError("is required")
+            except ValueError as e:
+                if errors is None:
+                    errors = {}
+                errors[key] = str(e)
+                continue
+            if key in data:
+                decoded[key] = value
+        if errors:
+            raise ValidationError(errors)
+        return decoded
+
+
+def parse_action(payload: Dict[str, Any]) -> Tuple[Optional[str], str, Dict[str, Any]]:
+    """
+    Extract the verb, action type and data of an inbound callback.
+
+    Accepts an ``Action.Execute`` invoke value (``{"action": {...}}``), the
+    fired action itself (as Qlik hosts send ``Action.Execute`` and
+    ``Action.ToggleVisibility``), or ``Action.Submit`` data with the input
+    values merged in.
+
+    Args:
+        payload: Inbound payload
+
+    Returns:
+        (verb or None, action type, data)
+    """
+    action = payload.get("action")
+    if not isinstance(action, dict):
+        action = payload
+    action_type = action.get("type") or "Action.Submit"
+    data = action.get("data")
+    if action is payload and action_type == "Action.Submit":
+        data = payload
+    data = data if isinstance(data, dict) else {}
+    verb = action.get(VERB_KEY) or data.get(VERB_KEY)
+    if action_type == "Action.Execute" and ("sheetId" in action or "sheetID" in action):
+        # menuList entries carry the sheet on the action rather than in data
+        data = dict(data)
+        for key in ("sheetId", "sheetID"):
+            if key in action:
+                data.setdefault(key, action[key])
+    return verb, action_type, data
+
+
+class ActionRouter:
+    """
+    Dispatch table for inbound callbacks, keyed by verb.
+
+    Callbacks without a verb are routed by action type (e.g. a plain
+    ``Action.Submit``); anything else goes to ``default``.
+
+    Args:
+        default: Handler for callbacks with no matching route (KeyError if None)
+    """
+
+    def __init__(self, default: Optional[Handler] = None):
+        self.default = default
+        self._routes: Dict[str, Tuple[Handler, Optional[PayloadSchema]]] = {}
+
+    def register(
+        self,
+        key: str,
+        handler: Handler,
+        schema: Optional[PayloadSchema] = None,
+    ) -> None:
+        """
+        Add a route.
+
+        Args:
+            key: Verb (e.g. "addToNewSheet", "elaborate") or action type
+            handler: Called with (decoded data, raw payload)
+            schema: Decoders for the inputs submitted with this verb
+        """
+        self._routes[key] = (handler, schema)
+
+    def route(self, key: str, schema: Optional[PayloadSchema] = None):
+        """Decorator form of ``register``."""
+
+        def decorator(handler: Handler) -> Handler:
+            self.register(key, handler, schema)
+            return handler
+
+        return decorator
+
+    def dispatch(self, payload: Dict[str, Any]) -> Any:
+        """
+        Decode an inbound callback and call its handler.
+
+        Args:
+            payload: Inbound payload (see ``parse_action``)
+
+        Returns:
+            The handler's result (a coroutine for async handlers)
+
+        Raises:
+            ValidationError: If input values violate the route's schema
+            KeyError: If no route matches and there is no default handler
+        """
+        verb, action_type, data = parse_action(payload)
+        entry = self._routes.get(verb) if verb else None
+        if entry is None:
+            entry = self._routes.get(action_type)
+        if entry is None:
+            if self.default is None:
+                raise KeyError(verb or action_type)
+            return self.default(data, payload)
+        handler, schema = entry
+        return handler(schema.decode(data) if schema is not None else data, payload)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._routes
@@ -0,0 +1,397 @@
+"""
+Local card-rendering service.
+
+Exposes the ``AAACards`` builders over HTTP/1.1 (TCP or Unix socket) so that
+consuming services do not each pay the import and warm-up cost:
+
+    python -m adaptive_card_builder.serve --port 8765 --workers 4
+    python -m adaptive_card_builder.serve --unix-socket /tmp/cards.sock
+
+Requests are ``POST /v1/<method>`` with a JSON object of keyword arguments,
+e.g. ``POST /v1/create_top_bar`` with ``{"analysisType": "KPI", "title": "Sales"}``.
+The response body is the encoded component (``?format=binary`` for the
+binary interchange format). ``GET /healthz`` returns service statistics.
+Arguments are checked against the method's signature and expected JSON types
+before rendering: invalid input gets ``400 Bad Request``, while failures inside
+the builders get ``500 Internal Server Error``.
+
+Rendering runs in a pool of pre-warmed worker processes. Connections are
+kept alive, and requests beyond ``workers + queue_size`` in flight are shed
+with ``503 Service Unavailable`` instead of queueing without bound. A render
+that times out keeps its slot until it actually finishes, and a pool whose
+worker crashed is replaced.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from . import binary
+from .cards import AAACards
+from .encoding import encode_card
+
+METHODS = frozenset(
+    ["create_skeleton", "create_top_bar", "create_chart", "menuList", "create_buttons"]
+)
+FORMATS = {"json": "application/json", "binary": "application/octet-stream"}
+
+_SIGNATURES = {method: inspect.signature(getattr(AAACards, method)) for method in METHODS}
+# Parameter -> JSON type accepted by the service.
+_PARAMETER_TYPES = {
+    "analysisType": str,
+    "title": (str, bool, type(None)),
+    "chart": dict,
+    "alternative_chart_types": list,
+    "expand": bool,
+    "sheetData": list,
+    "add_to_sheet": bool,
+    "sheet_list_actions": list,
+    "is_narrative_set": bool,
+    "card": dict,
+}
+# Parameters taking in-process helpers, which cannot be sent as JSON.
+_UNSUPPORTED = frozenset(["normalizer", "deferred_store", "elaboration"])
+
+_cards: Optional[AAACards] = None
+
+
+def _warm_worker() -> None:
+    """Process pool initializer: build the builders once per worker."""
+    global _cards
+    # AAACards prints debug output; keep it out of the service's stdout.
+    sys.stdout = open(os.devnull, "w")
+    _cards = AAACards()
+    _render("create_skeleton", {}, "json")
+
+
+def _validate(method: str, kwargs: Dict[str, Any]) -> Optional[str]:
+    """
+    Check request arguments before rendering.
+
+    Returns:
+        Error message for the client, or None if the arguments are valid
+    """
+    unsupported = sorted(_UNSUPPORTED.intersection(kwargs))
+    if unsupported:
+        return f"Unsupported arguments: {', '.join(unsupported)}"
+    try:
+        _SIGNATURES[method].bind(None, **kwargs)
+    except TypeError as exc:
+        return str(exc)
+    for name, value in kwargs.items():
+        expected = _PARAMETER_TYPES.get(name)
+        if expected is not None and not isinstance(value, expected):
+            return f"{name}: unexpected type {type(value).__name__}"
+    if method == "create_chart":
+        if "chartType" not in kwargs["chart"]:
+            return "chart: missing chartType"
+        if not _all_dicts(kwargs["alternative_chart_types"]):
+            return "alternative_chart_types: items must be objects"
+    elif method == "menuList":
+        for sheet in kwargs["sheetData"]:
+            if not isinstance(sheet, dict) or not {"title", "sheetId", "iconUrl"} <= sheet.keys():
+                return "sheetData: items need title, sheetId and iconUrl"
+    elif method == "create_buttons" and not _all_dicts(kwargs["sheet_list_actions"]):
+        return "sheet_list_actions: items must be objects"
+    return None
+
+
+def _all_dicts(items: List[Any]) -> bool:
+    return all(isinstance(item, dict) for item in items)
+
+
+def _render(method: str, kwargs: Dict[str, Any], fmt: str) -> bytes:
+    global _cards
+    if _cards is None:
+        _cards = AAACards()
+    result = getattr(_cards, method)(**kwargs)
+    return binary.dumps(result) if fmt == "binary" else encode_card(result)
+
+
+class _InlineExecutor(Executor):
+    """
+    Renders in the calling thread (``--workers 0``).
+
+    ``sys.stdout`` is discarded while any render is running, as it is in the
+    worker processes, to keep ``AAACards``' debug output out of the service's.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stdout = None
+        self._devnull = open(os.devnull, "w")
+
+    def _quiet(self, entering: bool) -> None:
+        with self._lock:
+            if entering:
+                if not self._active:
+                    self._stdout, sys.stdout = sys.stdout, self._devnull
+                self._active += 1
+            else:
+                self._active -= 1
+                if not self._active:
+                    sys.stdout = self._stdout
+
+    def submit(self, fn, *args, **kwargs):
+        future: Future = Future()
+        self._quiet(True)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            self._quiet(False)
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._devnull.close()
+
+
+class CardService:
+    """
+    Dispatches render requests to the worker pool with bounded admission.
+
+    Args:
+        workers: Number of worker processes (0 renders in the request thread)
+        queue_size: Requests allowed to wait for a worker before shedding
+        timeout: Seconds to wait for a render before failing the request
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 64, timeout: float = 30.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self.stats = {"requests": 0, "shed": 0, "errors": 0, "in_flight": 0, "restarts": 0}
+        if workers > 0:
+            self.executor: Executor = self._start_pool()
+            # Start (and warm) every worker now rather than on first request.
+            for future in [self.executor.submit(os.getpid) for _ in range(workers)]:
+                future.result()
+        else:
+            self.executor = _InlineExecutor()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def _restart(self, broken: Executor) -> None:
+        """Replace a pool broken by a crashed worker (once, however many requests saw it)."""
+        with self._pool_lock:
+            if self.executor is not broken:
+                return
+            self.executor = self._start_pool()
+        self._count("restarts")
+        broken.shutdown(wait=False)
+
+    def _submit(self, method: str, kwargs: Dict[str, Any], fmt: str):
+        """Submit a render, replacing the pool once if it is already broken."""
+        executor = self.executor
+        try:
+            return executor, executor.submit(_render, method, kwargs, fmt)
+        except BrokenProcessPool:
+            self._restart(executor)
+            executor = self.executor
+            return executor, executor.submit(_render, method, kwargs, fmt)
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += delta
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def render(self, method: str, kwargs: Dict[str, Any], fmt: str) -> Optional[bytes]:
+        """
+        Render one component.
+
+        The admission slot is held until the render finishes, even if the
+        request times out first, so slow renders cannot pile up in the pool.
+
+        Returns:
+            Encoded bytes, or None if the request was shed
+        """
+        self._count("requests")
+        if not self._slots.acquire(blocking=False):
+            self._count("shed")
+            return None
+        self._count("in_flight")
+        try:
+            executor, future = self._submit(method, kwargs, fmt)
+        except BaseException:
+            self._count("errors")
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # Drop the job if it has not started yet; otherwise it keeps the slot.
+            future.cancel()
+            self._count("errors")
+            raise
+        except BrokenProcessPool:
+            self._count("errors")
+            self._restart(executor)
+            raise
+        except Exception:
+            self._count("errors")
+            raise
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, workers=self.workers, queue_size=self.queue_size)
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            self.executor.shutdown(wait=True)
+
+
+class CardRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AdaptiveCardBuilder"
+    service: CardService = None
+    verbose = False
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers=None):
+        self._send(status, json.dumps({"error": message}).encode(), headers=headers)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/healthz":
+            self._send(200, json.dumps(self.service.health()).encode())
+        else:
+            self._error(404, "Not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be delimited, so the connection cannot be reused.
+            self.close_connection = True
+            return self._error(400, "Invalid Content-Length", headers={"Connection": "close"})
+        raw = self.rfile.read(length) if length else b""
+        prefix, _, method = url.path.rpartition("/")
+        if prefix != "/v1" or method not in METHODS:
+            return self._error(404, "Unknown method")
+        fmt = parse_qs(url.query).get("format", ["json"])[0]
+        if fmt not in FORMATS:
+            return self._error(400, f"Unknown format: {fmt}")
+        try:
+            kwargs = json.loads(raw) if raw else {}
+        except ValueError:
+            return self._error(400, "Request body must be JSON")
+        if not isinstance(kwargs, dict):
+            return self._error(400, "Request body must be a JSON object")
+        problem = _validate(method, kwargs)
+        if problem is not None:
+            return self._error(400, problem)
+        try:
+            body = self.service.render(method, kwargs, fmt)
+        except Exception as exc:
+            return self._error(500, f"{type(exc).__name__}: {exc}")
+        if body is None:
+            return self._error(503, "Overloaded", headers={"Retry-After": "1"})
+        self._send(200, body, FORMATS[fmt])
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, handler):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, handler)
+
+
+def make_server(
+    service: CardService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+    verbose: bool = False,
+) -> socketserver.BaseServer:
+    """
+    Create (but do not start) the HTTP server for a service.
+
+    Args:
+        service: CardService handling requests
+        host: TCP host to bind
+        port: TCP port to bind (0 picks a free port)
+        unix_socket: Path of a Unix socket to bind instead of TCP
+        verbose: Log every request to stderr
+
+    Returns:
+        Server instance; call ``serve_forever()`` to run it
+    """
+    handler = type(
+        "BoundCardRequestHandler",
+        (CardRequestHandler,),
+        {"service": service, "verbose": verbose},
+    )
+    if unix_socket:
+        return UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local Adaptive Card rendering service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="Serve on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    service = CardService(args.workers, args.queue_size, args.timeout)
+    server = make_server(service, args.host, args.port, args.unix_socket, args.verbose)
+    where = args.unix_socket or "http://%s:%d" % server.server_address[:2]
+    print(f"Serving AAACards on {where} with {args.workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
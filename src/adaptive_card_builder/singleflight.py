@@ -0,0 +1,230 @@
+"""
+Request coalescing (single-flight) for identical concurrent card builds.
+
+While a build for a given key is in flight, identical requests from other
+threads or asyncio tasks wait for it and share its result (or its exception)
+instead of building again. Nothing is kept once the build finishes, so this is
+not a cache: it only flattens bursts of identical concurrent requests.
+
+Example:
+    cards = CoalescingCards()
+    payload = cards.render("create_top_bar", "KPI", title="Total Sales")
+    payload = await cards.render_async("create_top_bar", "KPI", title="Total Sales")
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .cards import AAACards
+from .deferred import DeferredStore
+from .encoding import encode_card
+from .text import TextNormalizer
+from .utils import _recursive_render
+
+
+class _Unshareable(Exception):
+    """Raised while keying a call whose result must not be shared."""
+
+
+def _key_default(obj: Any) -> Any:
+    """Key helper arguments: a normalizer by its configuration."""
+    if isinstance(obj, TextNormalizer):
+        return {"TextNormalizer": obj.config}
+    if isinstance(obj, DeferredStore):
+        # The build stores subcards in this caller's store; a shared result
+        # would reference subcards missing from the other callers' stores.
+        raise _Unshareable
+    return vars(obj)
+
+
+def make_key(
+    method: str, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """
+    Build a normalized key for a card-building call.
+
+    Dict key order is ignored; element objects are compared by their contents
+    and ``TextNormalizer`` arguments by their configuration. Calls passing a
+    ``DeferredStore`` have side effects on that store, so they get no key and
+    must not be coalesced or cached.
+
+    Args:
+        method: Builder method name
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hex digest identifying the call, or None if its result cannot be shared
+    """
+    try:
+        payload = json.dumps(
+            [method, _recursive_render(list(args)), _recursive_render(kwargs or {})],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=_key_default,
+        )
+    except _Unshareable:
+        return None
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Builds started by do_async, kept referenced until they finish.
+        self._tasks = set()
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def _join(self, key: Hashable):
+        """Return (future, is_leader) for ``key``."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run ``fn`` unless an identical call is in flight, then share its outcome.
+
+        Args:
+            key: Call key (see ``make_key``)
+            fn: Zero-argument callable performing the build
+            timeout: Seconds a follower waits before raising ``TimeoutError``
+                (the in-flight build itself is not cancelled)
+
+        Returns:
+            Result of the (shared) call
+        """
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                raise TimeoutError(f"Timed out waiting for in-flight build {key!r}")
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            self._finish(key, future)
+        return future.result()
+
+    async def do_async(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Async version of ``do``; shares in-flight calls with threads too.
+
+        The build runs in its own task, so cancelling the caller that started
+        it (e.g. a client that disconnected) does not cancel the build or fail
+        the callers waiting for it.
+
+        Args:
+            key: Call key (see ``make_key``)
+            fn: Zero-argument coroutine function performing the build
+            timeout: Seconds a follower waits before raising ``TimeoutError``
+
+        Returns:
+            Result of the (shared) call
+        """
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out waiting for in-flight build {key!r}")
+
+        async def build() -> None:
+            try:
+                future.set_result(await fn())
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                self._finish(key, future)
+
+        task = asyncio.ensure_future(build())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        await asyncio.shield(task)
+        return future.result()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class CoalescingCards:
+    """
+    ``AAACards`` front end returning encoded bytes, coalescing identical builds.
+
+    Args:
+        cards: AAACards instance (a new one if None)
+        flight: SingleFlight group (a new one if None)
+        timeout: Default follower timeout in seconds
+    """
+
+    def __init__(
+        self,
+        cards: Optional[AAACards] = None,
+        flight: Optional[SingleFlight] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.cards = cards or AAACards()
+        self.flight = flight or SingleFlight()
+        self.timeout = timeout
+
+    def _build(self, method: str, args: tuple, kwargs: Dict[str, Any]) -> bytes:
+        return encode_card(getattr(self.cards, method)(*args, **kwargs))
+
+    def render(self, method: str, *args, **kwargs) -> bytes:
+        """
+        Build and encode ``AAACards.<method>(*args, **kwargs)``.
+
+        Calls that ``make_key`` cannot key are built without coalescing.
+
+        Returns:
+            Encoded card bytes (shared between coalesced callers)
+        """
+        key = make_key(method, args, kwargs)
+        if key is None:
+            return self._build(method, args, kwargs)
+        return self.flight.do(key, lambda: self._build(method, args, kwargs), self.timeout)
+
+    async def render_async(self, method: str, *args, **kwargs) -> bytes:
+        """
+        Async version of ``render``; the build runs in the default executor.
+
+        Returns:
+            Encoded card bytes (shared between coalesced callers)
+        """
+        key = make_key(method, args, kwargs)
+        loop = asyncio.get_running_loop()
+
+        def build():
+            return loop.run_in_executor(None, self._build, method, args, kwargs)
+
+        if key is None:
+            return await build()
+        return await self.flight.do_async(key, build, self.timeout)
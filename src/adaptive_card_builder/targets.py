@@ -0,0 +1,320 @@
+"""
+Host-targeted compilation of cards.
+
+The same card is delivered to Qlik hosts, which understand the Qlik
+extensions (``Qlik.Chart``, ``Qlik.Skeleton``, ``Qlik.Tag``,
+``Action.ShowModal``, ``Action.MenuDropdown``, ``isSkeleton``), and to plain
+Microsoft Teams, which does not. A ``TargetProfile`` describes what a host
+needs: per-type rules that replace, splice or drop elements, flags that drop
+an element entirely, and properties to strip. The profile compiles into one
+dispatch table, applied in a single walk over the card's element and action
+positions (``ELEMENT_KEYS``); ``data`` payloads, chart definitions and other
+properties are passed through untouched, and containers that need no change
+are shared rather than copied.
+
+``TargetRenderer`` encodes a card for several targets and caches the result
+per (caller's card key, target).
+
+Example:
+    renderer = TargetRenderer()
+    payloads = renderer.render(card, [QLIK, TEAMS], key=card_id)
+    send_to_teams(payloads["teams"])
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from .encoding import encode_card
+from .utils import _recursive_render
+
+# A rule receives an element dict and returns its replacement: a dict, a list
+# of elements to splice into the parent list, or None to drop the element.
+Rule = Callable[[Dict[str, Any]], Any]
+
+_DROP = object()
+
+# Properties holding elements or actions; everything else is data.
+ELEMENT_KEYS = frozenset(
+    {"body", "items", "columns", "actions", "card", "selectAction", "inlineAction", "fallback", "images"}
+)
+
+
+class TargetProfile:
+    """
+    Description of what one host supports.
+
+    Args:
+        name: Target name (cache key and result key)
+        rules: Element/action type -> Rule
+        drop_flags: Elements with any of these properties set to True are dropped
+        drop_properties: Properties removed from every element
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rules: Optional[Dict[str, Rule]] = None,
+        drop_flags: Iterable[str] = (),
+        drop_properties: Iterable[str] = (),
+    ):
+        self.name = name
+        self.rules = dict(rules or {})
+        self.drop_flags: FrozenSet[str] = frozenset(drop_flags)
+        self.drop_properties: FrozenSet[str] = frozenset(drop_properties)
+        self._transform = None
+
+    @property
+    def is_identity(self) -> bool:
+        return not (self.rules or self.drop_flags or self.drop_properties)
+
+    def compile(self) -> Callable[[Any], Any]:
+        """
+        Build the fused single-pass transform for this profile.
+
+        Returns:
+            Function mapping a rendered card to its target form
+        """
+        if self._transform is not None:
+            return self._transform
+        rules = self.rules
+        drop_flags = self.drop_flags
+        drop_properties = self.drop_properties
+
+        def element(node: Dict[str, Any], apply_rule: bool = True) -> Any:
+            for flag in drop_flags:
+                if node.get(flag) is True:
+                    return _DROP
+            if apply_rule:
+                rule = rules.get(node.get("type"))
+                if rule is not None:
+                    replacement = rule(node)
+                    if replacement is None:
+                        return _DROP
+                    if isinstance(replacement, list):
+                        # same list handling as a parent list: drops and nested splices
+                        return walk(replacement)
+                    return element(replacement, apply_rule=replacement.get("type") != node.get("type"))
+            result = None
+            for key, value in node.items():
+                if key in drop_properties:
+                    if result is None:
+                        result = {k: v for k, v in node.items() if k not in drop_properties}
+                    continue
+                if key not in ELEMENT_KEYS:
+                    continue
+                new = walk(value)
+                if isinstance(new, list) and isinstance(value, dict):
+                    # a spliced replacement in a single-element position
+                    new = new[0] if new else _DROP
+                if new is not value:
+                    if result is None:
+                        result = {k: v for k, v in node.items() if k not in drop_properties}
+                    if new is _DROP:
+                        del result[key]
+                    else:
+                        result[key] = new
+            return node if result is None else result
+
+        def walk(node: Any) -> Any:
+            if isinstance(node, dict):
+                return element(node)
+            if isinstance(node, list):
+                out = None
+                for i, item in enumerate(node):
+                    new = element(item) if isinstance(item, dict) else item
+                    if new is item and out is None:
+                        continue
+                    if out is None:
+                        out = node[:i]
+                    if new is _DROP:
+                        continue
+                    if isinstance(new, list) and isinstance(item, dict):
+                        out.extend(new)  # spliced replacement
+                    else:
+                        out.append(new)
+                return node if out is None else out
+            return node
+
+        def transform(card: Any) -> Any:
+            result = walk(card)
+            return None if result is _DROP else result
+
+        self._transform = transform
+        return transform
+
+    def apply(self, card: Any) -> Any:
+        """
+        Transform a card for this target.
+
+        Args:
+            card: Card, element, dict or list
+
+        Returns:
+            Card in the target's form (shares unchanged subtrees with the input)
+        """
+        return self.compile()(_recursive_render(card))
+
+
+# Qlik.Tag colors -> TextBlock colors
+_TAG_COLORS = {
+    "info": "accent",
+    "success": "good",
+    "warning": "warning",
+    "error": "attention",
+    "danger": "attention",
+}
+
+
+def _is_url(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://", "data:"))
+
+
+def chart_fallback(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Qlik.Chart -> Image of the chart's fallback URL (or a note if none)."""
+    chart = node.get("chart") or {}
+    url = node.get("fallbackUrl") or chart.get("imageUrl")
+    if _is_url(url):
+        return {"type": "Image", "url": url, "altText": chart.get("title") or "Chart"}
+    return {
+        "type": "TextBlock",
+        "text": "Open this card in Qlik to view the chart.",
+        "isSubtle": True,
+        "wrap": True,
+    }
+
+
+def tag_fallback(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Qlik.Tag -> small bold TextBlock."""
+    return {
+        "type": "TextBlock",
+        "text": node.get("text", ""),
+        "size": "small",
+        "weight": "bolder",
+        "color": _TAG_COLORS.get(node.get("color"), "default"),
+    }
+
+
+def menu_dropdown_fallback(node: Dict[str, Any]) -> list:
+    """Action.MenuDropdown -> its entries, spliced into the parent ActionSet."""
+    return list(node.get("actions") or [])
+
+
+def execute_fallback(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Action.Execute with Qlik sheet properties -> plain Action.Execute with data."""
+    action = {"type": "Action.Execute", "title": node.get("title", "")}
+    if "verb" in node:
+        action["verb"] = node["verb"]
+    data = dict(node.get("data") or {})
+    for key in ("sheetId", "sheetID"):
+        if key in node:
+            data[key] = node[key]
+    if data:
+        action["data"] = data
+    if _is_url(node.get("iconUrl")):
+        action["iconUrl"] = node["iconUrl"]
+    return action
+
+
+def _strip_icon(node: Dict[str, Any]) -> Dict[str, Any]:
+    if "iconUrl" in node and not _is_url(node["iconUrl"]):
+        return {k: v for k, v in node.items() if k != "iconUrl"}
+    return node
+
+
+QLIK = TargetProfile("qlik")
+
+TEAMS = TargetProfile(
+    "teams",
+    rules={
+        "Qlik.Chart": chart_fallback,
+        "Qlik.Skeleton": lambda node: None,
+        "Qlik.Tag": tag_fallback,
+        "Action.ShowModal": lambda node: None,
+        "Action.MenuDropdown": menu_dropdown_fallback,
+        "Action.Execute": execute_fallback,
+        "Action.ShowCard": _strip_icon,
+        "Action.ToggleVisibility": _strip_icon,
+    },
+    drop_flags=["isSkeleton"],
+    drop_properties=[
+        "fullWidth",
+        "layout",
+        "activeIconUrl",
+        "activeTitle",
+        "addPaddingLeft",
+        "data_size",
+        "content",
+    ],
+)
+
+
+class TargetRenderer:
+    """
+    Encodes cards per target with an LRU cache keyed by (card key, target).
+
+    Args:
+        max_entries: Number of cached encodings
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[Hashable, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self,
+        card: Any,
+        targets: Iterable[TargetProfile],
+        key: Optional[Hashable] = None,
+    ) -> Dict[str, bytes]:
+        """
+        Encode a card for each target.
+
+        Each uncached target costs one transform walk and one encode; with a
+        ``key``, targets already cached cost neither.
+
+        Args:
+            card: Card, element, dict or list
+            targets: Target profiles
+            key: Caller's identifier of the card's content (e.g. card id and
+                version); results are cached only when given
+
+        Returns:
+            Target name -> encoded bytes
+        """
+        results = {}
+        missing = []
+        for target in targets:
+            if key is None:
+                missing.append(target)
+                continue
+            with self._lock:
+                cached = self._cache.get((key, target.name))
+                if cached is None:
+                    self.misses += 1
+                    missing.append(target)
+                    continue
+                self._cache.move_to_end((key, target.name))
+                self.hits += 1
+            results[target.name] = cached
+        if not missing:
+            return results
+        rendered = _recursive_render(card)
+        source = None
+        for target in missing:
+            if target.is_identity:
+                if source is None:
+                    source = encode_card(rendered)
+                encoded = source
+            else:
+                encoded = encode_card(target.compile()(rendered))
+            results[target.name] = encoded
+            if key is not None:
+                with self._lock:
+                    self._cache[(key, target.name)] = encoded
+                    if len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+        return results
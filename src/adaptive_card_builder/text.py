@@ -0,0 +1,188 @@
+"""
+Text normalization for LLM-generated card text.
+
+``TextNormalizer`` applies, with precompiled patterns: Unicode
+normalization, control character removal, whitespace collapsing, markdown
+escaping and length-aware truncation. Results are memoized, so repeated
+strings such as titles are processed once.
+
+``normalize_card`` / ``normalize_cards`` apply a normalizer to every text node
+of a card (or a batch of cards) in a single walk.
+
+Example:
+    normalizer = TextNormalizer(max_length=200)
+    block = text_block(llm_title, normalizer=normalizer)
+    cards = normalize_cards(cards, normalizer)
+"""
+
+import functools
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Markdown characters escaped anywhere, and block markers escaped at line start.
+_MARKDOWN_INLINE_RE = re.compile(r"([\\`*_\[\]~|])")
+_MARKDOWN_BLOCK_RE = re.compile(r"^([ \t]*)([#>+-]|\d+\.)", re.MULTILINE)
+# C0/C1 control characters other than tab and newline.
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f-\x9f]")
+_SPACES_RE = re.compile(r"[ \t\r\f\v\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_SPACE_AROUND_NEWLINE_RE = re.compile(r" ?\n ?")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Element type -> properties holding display text. Facts are matched by
+# position (items of ``FactSet.facts``) rather than by their type.
+TEXT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "TextBlock": ("text",),
+    "TextRun": ("text",),
+    "Fact": ("title", "value"),
+}
+
+
+class TextNormalizer:
+    """
+    Memoized text normalization pipeline.
+
+    Args:
+        unicode_form: Unicode normalization form ("NFC", "NFKC", ...) or None
+        collapse_whitespace: Collapse runs of spaces and blank lines
+        escape_markdown: Backslash-escape markdown characters
+        max_length: Truncate to at most this many characters (None: no limit)
+        ellipsis: Appended to truncated text (counted in ``max_length``)
+        cache_size: Number of memoized strings
+    """
+
+    def __init__(
+        self,
+        unicode_form: Optional[str] = "NFC",
+        collapse_whitespace: bool = True,
+        escape_markdown: bool = False,
+        max_length: Optional[int] = None,
+        ellipsis: str = "…",
+        cache_size: int = 4096,
+    ):
+        self.unicode_form = unicode_form
+        self.collapse_whitespace = collapse_whitespace
+        self.escape_markdown = escape_markdown
+        self.max_length = max_length
+        self.ellipsis = ellipsis
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._normalize)
+
+    def __call__(self, text: str) -> str:
+        """
+        Normalize one string.
+
+        Args:
+            text: Raw text
+
+        Returns:
+            Normalized text
+        """
+        return self._cached(text)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Constructor arguments; equal configs normalize text identically."""
+        return {
+            "unicode_form": self.unicode_form,
+            "collapse_whitespace": self.collapse_whitespace,
+            "escape_markdown": self.escape_markdown,
+            "max_length": self.max_length,
+            "ellipsis": self.ellipsis,
+            "cache_size": self._cached.cache_parameters()["maxsize"],
+        }
+
+    def _normalize(self, text: str) -> str:
+        if self.unicode_form and not (text.isascii() and self.unicode_form in ("NFC", "NFD")):
+            text = unicodedata.normalize(self.unicode_form, text)
+        text = _CONTROL_RE.sub("", text)
+        if self.collapse_whitespace:
+            text = _SPACES_RE.sub(" ", text)
+            text = _SPACE_AROUND_NEWLINE_RE.sub("\n", text)
+            text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+        if self.escape_markdown:
+            text = _MARKDOWN_INLINE_RE.sub(r"\\\1", text)
+            text = _MARKDOWN_BLOCK_RE.sub(r"\1\\\2", text)
+        if self.max_length is not None and len(text) > self.max_length:
+            text = self._truncate(text)
+        return text
+
+    def _truncate(self, text: str) -> str:
+        limit = max(self.max_length - len(self.ellipsis), 0)
+        cut = text[:limit]
+        # Prefer a word boundary if one is reasonably close to the limit.
+        space = cut.rfind(" ")
+        if space >= limit * 0.8:
+            cut = cut[:space]
+        cut = cut.rstrip()
+        # Do not leave the backslash of an escape sequence without its character.
+        if self.escape_markdown and (len(cut) - len(cut.rstrip("\\"))) % 2:
+            cut = cut[:-1]
+        return cut + self.ellipsis
+
+
+def normalize_card(
+    card: Any,
+    normalizer: TextNormalizer,
+    fields: Optional[Dict[str, Tuple[str, ...]]] = None,
+) -> Any:
+    """
+    Normalize every text node of a card in one walk.
+
+    Only dicts and lists are walked; containers without text nodes are
+    returned as-is rather than copied.
+
+    Args:
+        card: Card dict, list of elements or element dict
+        normalizer: TextNormalizer to apply
+        fields: Element type -> text properties (defaults to ``TEXT_FIELDS``)
+
+    Returns:
+        Card with normalized text
+    """
+    fields = TEXT_FIELDS if fields is None else fields
+
+    def walk(node: Any, kind: Optional[str] = None) -> Any:
+        if isinstance(node, list):
+            items = [walk(item, kind) for item in node]
+            return node if all(a is b for a, b in zip(items, node)) else items
+        if not isinstance(node, dict):
+            return node
+        node_type = node.get("type")
+        text_keys = fields.get(kind or node_type, ())
+        result = None
+        for key, value in node.items():
+            if key in text_keys and isinstance(value, str):
+                new = normalizer(value)
+                changed = new != value
+            else:
+                new = walk(value, "Fact" if key == "facts" and node_type == "FactSet" else None)
+                changed = new is not value
+            if changed:
+                if result is None:
+                    result = dict(node)
+                result[key] = new
+        return node if result is None else result
+
+    return walk(card)
+
+
+def normalize_cards(
+    cards: Iterable[Any],
+    normalizer: TextNormalizer,
+    fields: Optional[Dict[str, Tuple[str, ...]]] = None,
+) -> List[Any]:
+    """
+    Normalize a batch of cards, sharing the normalizer's memo across them.
+
+    Args:
+        cards: Cards to normalize
+        normalizer: TextNormalizer to apply
+        fields: Element type -> text properties (defaults to ``TEXT_FIELDS``)
+
+    Returns:
+        List of normalized cards
+    """
+    return [normalize_card(card, normalizer, fields) for card in cards]
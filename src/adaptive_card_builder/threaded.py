@@ -0,0 +1,150 @@
+"""
+Thread-pool batch rendering.
+
+``AAACards`` and the element functions keep no state, and the library's
+caches (``FragmentCache``, ``DeferredStore``, ``TargetRenderer``,
+``InMemorySink``, ``TextNormalizer``'s memo) synchronize internally, so cards
+can be built from several threads at once. On free-threaded CPython
+(3.13t and later) this scales across cores without pickling card trees
+between processes; on the GIL build it mainly overlaps I/O-bound callers.
+
+``ThreadedRenderer`` renders a batch of ``AAACards`` calls to encoded bytes on
+a thread pool, with an optional lock-striped result cache. Batches of one,
+and renderers with a single worker, run inline so single-threaded latency is
+unchanged.
+
+Example:
+    renderer = ThreadedRenderer(max_workers=8)
+    payloads = renderer.render_batch([
+        ("create_top_bar", ("KPI", "Sales"), {}),
+        ("create_chart", ({"chartType": "barchart"}, []), {}),
+    ])
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .cards import AAACards
+from .encoding import encode_card
+from .singleflight import make_key
+
+Request = Tuple[str, tuple, Dict[str, Any]]
+
+
+class StripedCache:
+    """
+    LRU cache split into independently locked stripes.
+
+    Threads touching different keys rarely contend for the same lock.
+
+    Args:
+        max_entries: Total capacity (divided evenly between stripes)
+        stripes: Number of stripes
+    """
+
+    def __init__(self, max_entries: int = 4096, stripes: int = 16):
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+        self._per_stripe = max(1, max_entries // stripes)
+
+    def _stripe(self, key: Hashable):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        lock, entries = self._stripe(key)
+        with lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        lock, entries = self._stripe(key)
+        with lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self._per_stripe:
+                entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self._stripes)
+
+
+class ThreadedRenderer:
+    """
+    Renders batches of ``AAACards`` calls on a thread pool.
+
+    Args:
+        max_workers: Number of threads (defaults to the CPU count)
+        cache: Optional StripedCache of encoded results keyed by normalized call
+            (calls passing a DeferredStore are not cached, see ``make_key``)
+        cards: AAACards instance shared by all threads (a new one if None)
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[StripedCache] = None,
+        cards: Optional[AAACards] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.cards = cards or AAACards()
+        self._pool = (
+            ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        )
+
+    def render(self, method: str, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Render one call in the calling thread.
+
+        Returns:
+            Encoded bytes of ``AAACards.<method>(*args, **kwargs)``
+        """
+        kwargs = kwargs or {}
+        key = make_key(method, args, kwargs) if self.cache is not None else None
+        if key is None:
+            return encode_card(getattr(self.cards, method)(*args, **kwargs))
+        encoded = self.cache.get(key)
+        if encoded is None:
+            encoded = encode_card(getattr(self.cards, method)(*args, **kwargs))
+            self.cache.put(key, encoded)
+        return encoded
+
+    def render_batch(self, requests: Iterable[Request]) -> List[bytes]:
+        """
+        Render a batch of calls, in parallel when there is more than one.
+
+        Args:
+            requests: (method, args, kwargs) tuples
+
+        Returns:
+            Encoded bytes per request, in request order
+        """
+        requests = list(requests)
+        if self._pool is None or len(requests) <= 1:
+            return [self.render(*request) for request in requests]
+        chunk = max(1, len(requests) // (self.max_workers * 4))
+        futures = [
+            self._pool.submit(self._render_chunk, requests[i : i + chunk])
+            for i in range(0, len(requests), chunk)
+        ]
+        results: List[bytes] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def _render_chunk(self, requests: List[Request]) -> List[bytes]:
+        return [self.render(*request) for request in requests]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ThreadedRenderer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,21 +1,108 @@
 from typing import List, Optional
 import json
 
+from .instrumentation import instrumented, stage
+
+
+_MISSING = object()
+_IN_PROGRESS = object()
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class _Frame:
+    """A list or dict whose children are being rendered."""
+
+    __slots__ = ("node", "memo_key", "items", "index", "copy", "is_dict")
+
+    def __init__(self, node, memo_key):
+        self.node = node
+        self.memo_key = memo_key
+        self.is_dict = isinstance(node, dict)
+        self.items = list(node.items()) if self.is_dict else node
+        self.index = -1
+        self.copy = None
+
+    def next_child(self):
+        self.index += 1
+        if self.index >= len(self.items):
+            return _MISSING
+        return self.items[self.index][1] if self.is_dict else self.items[self.index]
+
+    def accept(self, result):
+        if self.is_dict:
+            key, original = self.items[self.index]
+            if self.copy is None and result is not original:
+                self.copy = dict(self.items[: self.index])
+            if self.copy is not None:
+                self.copy[key] = result
+        else:
+            original = self.items[self.index]
+            if self.copy is None and result is not original:
+                self.copy = self.items[: self.index]
+            if self.copy is not None:
+                self.copy.append(result)
+
+    def result(self):
+        return self.node if self.copy is None else self.copy
+
 
 def _recursive_render(obj):
-    if hasattr(obj, "render") and callable(obj.render):
-        return _recursive_render(obj.render())
-    elif isinstance(obj, list):
-        return [_recursive_render(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: _recursive_render(v) for k, v in obj.items()}
-    else:
-        return obj
+    """
+    Resolve every ``render()``-able object inside a card tree.
+
+    Uses an explicit stack, so deeply nested cards (e.g. chains of
+    Action.ShowCard) cannot hit the recursion limit. Lists and dicts that
+    contain nothing to render are returned as-is rather than copied, and a
+    subtree shared in several places is rendered only once per call.
+
+    Args:
+        obj: Card, element, list, dict or scalar
+
+    Returns:
+        Tree of plain lists, dicts and scalars
+    """
+    # id(node) -> (node, result); the node is kept so its id cannot be reused
+    memo = {}
+    stack = []
+
+    def visit(node):
+        if type(node) in _SCALAR_TYPES:
+            return node
+        hit = memo.get(id(node), _MISSING)
+        if hit is not _MISSING:
+            if hit[1] is _IN_PROGRESS:
+                raise ValueError("Circular reference detected")
+            return hit[1]
+        start = node
+        while hasattr(node, "render") and callable(node.render):
+            node = node.render()
+        if isinstance(node, (list, dict)):
+            memo[id(start)] = (start, _IN_PROGRESS)
+            stack.append(_Frame(node, id(start)))
+            return _MISSING
+        memo[id(start)] = (start, node)
+        return node
+
+    result = visit(obj)
+    while stack:
+        frame = stack[-1]
+        if result is not _MISSING:
+            frame.accept(result)
+        child = frame.next_child()
+        if child is _MISSING:
+            stack.pop()
+            result = frame.result()
+            memo[frame.memo_key] = (memo[frame.memo_key][0], result)
+        else:
+            result = visit(child)
+    return result
 
 
 def prettify_json(card, indent: int = 2) -> str:
-    rendered = _recursive_render(card)
-    return json.dumps(rendered, indent=indent)
+    with stage("utils._recursive_render"):
+        rendered = _recursive_render(card)
+    with stage("utils.prettify_json.encode"):
+        return json.dumps(rendered, indent=indent)
     """
     Get the approximate size of a card in terms of elements.
     
@@ -28,6 +115,7 @@ def prettify_json(card, indent: int = 2) -> str:
     return {"body_count": len(card.body), "actions_count": len(card.actions)}
 
 
+@instrumented("utils.to_dict")
 def to_dict(card_obj):
     return json.loads(
         json.dumps(
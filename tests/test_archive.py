@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from adaptive_card_builder import archive as archive_module
+from adaptive_card_builder.archive import DATA_FILE, INDEX_FILE, CardArchive
+
+
+def payload(i):
+    return b'{"type":"AdaptiveCard","n":%d}' % i
+
+
+def test_round_trip_and_reopen(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("a", payload(1), analysis_type="KPI", timestamp=10)
+        archive.append_batch([("b", payload(2), "Trend", 20), ("c", {"type": "x"}, "KPI", 30)])
+        assert bytes(archive.get("a")) == payload(1)
+        assert bytes(archive.get("c")) == b'{"type":"x"}'
+    with CardArchive(str(tmp_path)) as archive:
+        assert len(archive) == 3
+        assert bytes(archive.get("b")) == payload(2)
+        assert archive.find(analysis_type="KPI") == ["a", "c"]
+        assert archive.find(start=15, end=30) == ["b"]
+        assert archive.get("missing") is None
+
+
+def test_supersede_and_delete_survive_reopen(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("a", payload(1), timestamp=1)
+        archive.append("a", payload(2), timestamp=2)
+        archive.append("b", payload(3), timestamp=3)
+        assert archive.delete("b")
+        assert not archive.delete("b")
+    with CardArchive(str(tmp_path)) as archive:
+        assert bytes(archive.get("a")) == payload(2)
+        assert "b" not in archive
+        assert archive.stats()["dead_records"] == 2
+
+
+def test_torn_index_tail_is_truncated(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("a", payload(1))
+        archive.append("b", payload(2))
+    index_path = os.path.join(str(tmp_path), INDEX_FILE)
+    size = os.path.getsize(index_path)
+    with open(index_path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    with CardArchive(str(tmp_path)) as archive:
+        assert len(archive) == 2
+        archive.append("c", payload(3))
+    assert os.path.getsize(index_path) > size
+    with CardArchive(str(tmp_path)) as archive:
+        assert bytes(archive.get("c")) == payload(3)
+
+
+def test_entry_without_data_is_dropped(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("a", payload(1))
+        archive.append("b", payload(2))
+    data_path = os.path.join(str(tmp_path), DATA_FILE)
+    os.truncate(data_path, os.path.getsize(data_path) - 1)
+    with CardArchive(str(tmp_path)) as archive:
+        assert list(archive.find()) == ["a"]
+
+
+def test_compact_drops_dead_records(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        for i in range(10):
+            archive.append("a", payload(i), timestamp=i)
+        archive.append("b", payload(99), timestamp=50)
+        archive.delete("b")
+        before = archive.stats()["data_bytes"]
+        archive.compact()
+        assert archive.stats()["dead_records"] == 0
+        assert archive.stats()["data_bytes"] < before
+        assert bytes(archive.get("a")) == payload(9)
+    with CardArchive(str(tmp_path)) as archive:
+        assert bytes(archive.get("a")) == payload(9)
+        assert "b" not in archive
+    assert sorted(os.listdir(str(tmp_path))) == [DATA_FILE, INDEX_FILE]
+
+
+def test_compact_interrupted_between_renames(tmp_path, monkeypatch):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("old", b"x" * 100)
+        archive.append("a", payload(1))
+        archive.append("b", payload(2))
+        archive.delete("old")
+        real_replace = os.replace
+        calls = []
+
+        def crash_on_second(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("simulated crash")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(archive_module.os, "replace", crash_on_second)
+        with pytest.raises(OSError):
+            archive.compact()
+        monkeypatch.setattr(archive_module.os, "replace", real_replace)
+    with CardArchive(str(tmp_path)) as archive:
+        assert bytes(archive.get("a")) == payload(1)
+        assert bytes(archive.get("b")) == payload(2)
+        assert "old" not in archive
+
+
+def test_mismatched_generations_are_rejected(tmp_path):
+    with CardArchive(str(tmp_path)) as archive:
+        archive.append("a", payload(1))
+    index_path = os.path.join(str(tmp_path), INDEX_FILE)
+    with open(index_path, "r+b") as f:
+        f.seek(8)
+        f.write((7).to_bytes(8, "little"))
+    with pytest.raises(ValueError):
+        CardArchive(str(tmp_path))
+
+
+def test_concurrent_get_never_sees_short_reads(tmp_path):
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    archive = CardArchive(str(tmp_path))
+    done = threading.Event()
+    current = [0]
+    bad = []
+
+    def reader():
+        while not done.is_set():
+            card_id = str(current[0])
+            view = archive.get(card_id)
+            if view is not None and bytes(view) != payload(int(card_id)):
+                bad.append(card_id)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for i in range(5000):
+            current[0] = i
+            archive.append(str(i), payload(i), timestamp=i)
+    finally:
+        done.set()
+        thread.join()
+        archive.close()
+        sys.setswitchinterval(interval)
+    assert bad == []
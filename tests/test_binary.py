@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from adaptive_card_builder import AAACards, binary
+from adaptive_card_builder.utils import to_dict
+
+CARD = {
+    "type": "AdaptiveCard",
+    "version": "1.5",
+    "body": [
+        {"type": "TextBlock", "text": "Total sales ✓", "size": "large", "wrap": True},
+        {"type": "Container", "items": [], "style": None, "data": {}},
+        {"type": "Qlik.Chart", "values": [0, 1, -1, 2**40, -(2**40), 1.5, -0.0, 1e300]},
+        {"type": "FactSet", "facts": [{"title": "k" * 100, "value": "k" * 100}]},
+    ],
+    "flags": [True, False, None],
+}
+
+
+def deep_show_card(depth):
+    card = {"type": "AdaptiveCard", "body": []}
+    for i in range(depth):
+        card = {
+            "type": "AdaptiveCard",
+            "body": [{"type": "TextBlock", "text": str(i)}],
+            "actions": [{"type": "Action.ShowCard", "title": "More", "card": card}],
+        }
+    return card
+
+
+def test_header():
+    data = binary.dumps(CARD)
+    assert data[:3] == binary.MAGIC
+    assert data[3] == binary.VERSION
+    with pytest.raises(ValueError):
+        binary.loads(b"XYZ" + data[3:])
+    with pytest.raises(ValueError):
+        binary.loads(data + b"\x00")
+
+
+def test_round_trip():
+    assert binary.loads(binary.dumps(CARD)) == CARD
+
+
+def test_round_trip_of_built_cards():
+    aaa = AAACards()
+    card = aaa.create_chart({"chartType": "barchart"}, [{"chartType": "linechart"}])
+    assert binary.loads(binary.dumps(card)) == to_dict(card)
+
+
+def test_repeated_strings_are_interned():
+    data = binary.dumps([{"label": "repeated value"} for _ in range(50)])
+    assert data.count(b"repeated value") == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"indent": 2},
+        {"separators": (",", ":")},
+        {"ensure_ascii": False},
+        {"indent": 4, "separators": (", ", ": "), "ensure_ascii": False},
+    ],
+)
+def test_to_json_matches_json_dumps(kwargs):
+    assert binary.to_json(binary.dumps(CARD), **kwargs) == json.dumps(CARD, **kwargs)
+
+
+def test_deep_nesting():
+    card = deep_show_card(5000)
+    data = binary.dumps(card)
+    decoded = binary.loads(data)
+    depth = 0
+    while "actions" in decoded:
+        decoded = decoded["actions"][0]["card"]
+        depth += 1
+    assert depth == 5000
+    text = binary.to_json(data, separators=(",", ":"))
+    assert text.count("Action.ShowCard") == 5000
+    assert text.startswith('{"type":"AdaptiveCard","body":[{"type":"TextBlock","text":"4999"}]')
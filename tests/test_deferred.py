@@ -0,0 +1,59 @@
+from adaptive_card_builder.cards import AAACards
+from adaptive_card_builder.deferred import REFERENCE_KEY, DeferredStore, reference_card
+from adaptive_card_builder.encoding import encode_card
+from adaptive_card_builder.singleflight import CoalescingCards, make_key
+from adaptive_card_builder.threaded import StripedCache, ThreadedRenderer
+
+ASSUMPTIONS = {"type": "AdaptiveCard", "body": [{"type": "TextBlock", "text": "assumed"}]}
+
+
+def test_put_dedupes_identical_subcards_and_fetches_them():
+    store = DeferredStore()
+    first = store.put(ASSUMPTIONS, "assumptions")
+    assert first.startswith("assumptions-")
+    assert store.put(dict(ASSUMPTIONS), "assumptions") == first
+    assert len(store) == 1
+    assert store.fetch(first) == ASSUMPTIONS
+    assert store.fetch("assumptions-missing") is None
+
+
+def test_put_evicts_oldest_entries():
+    store = DeferredStore(max_entries=2)
+    ids = [store.put({"type": "TextBlock", "text": str(i)}) for i in range(3)]
+    assert len(store) == 2
+    assert store.fetch(ids[0]) is None
+    assert store.fetch(ids[2]) == {"type": "TextBlock", "text": "2"}
+
+
+def test_resolve_accepts_each_payload_shape():
+    store = DeferredStore()
+    subcard_id = store.put(ASSUMPTIONS)
+    card = reference_card(subcard_id)
+    assert card == {"type": "AdaptiveCard", "body": [], REFERENCE_KEY: subcard_id}
+    assert store.resolve(card) == ASSUMPTIONS
+    assert store.resolve({"type": "Action.ShowCard", "card": card}) == ASSUMPTIONS
+    assert store.resolve({"verb": "elaborate", "data": {REFERENCE_KEY: subcard_id}}) == ASSUMPTIONS
+    assert store.resolve({"value": {REFERENCE_KEY: subcard_id}}) == ASSUMPTIONS
+    assert store.resolve({"verb": "elaborate"}) is None
+
+
+def test_create_buttons_defers_assumptions_card():
+    store = DeferredStore()
+    buttons = encode_card(AAACards().create_buttons(True, [], False, ASSUMPTIONS, deferred_store=store))
+    (subcard_id,) = store._entries
+    assert b"assumed" not in buttons
+    assert subcard_id.encode() in buttons
+
+
+def test_calls_with_a_store_are_not_shared():
+    args = (True, [], False, ASSUMPTIONS)
+    assert make_key("create_buttons", args, {"deferred_store": DeferredStore()}) is None
+    stores = [DeferredStore(), DeferredStore()]
+    for store in stores:
+        payload = CoalescingCards().render("create_buttons", *args, deferred_store=store)
+        assert b"assumed" not in payload
+    renderer = ThreadedRenderer(max_workers=1, cache=StripedCache())
+    renderer.render("create_buttons", args, {"deferred_store": stores[0]})
+    assert len(renderer.cache) == 0
+    for store in stores:
+        assert store.resolve(reference_card(next(iter(store._entries)))) == ASSUMPTIONS
@@ -0,0 +1,30 @@
+import json
+
+from adaptive_card_builder.documents import CardDocument
+
+CARD = {
+    "type": "AdaptiveCard",
+    "body": [{"type": "TextBlock", "text": "a"}, {"type": "Container", "items": [1, 2.5, None]}],
+}
+
+
+def test_edits_share_untouched_subtrees():
+    base = CardDocument.from_obj(CARD)
+    edited = base.set(("body", 0, "text"), "b")
+    assert edited.to_dict()["body"][0]["text"] == "b"
+    assert base.to_dict() == CARD
+    assert edited.root["body"][1] is base.root["body"][1]
+    assert json.loads(edited.encode())["body"][0]["text"] == "b"
+
+
+def test_encode_matches_json_dumps():
+    assert CardDocument.from_obj(CARD).encode() == json.dumps(CARD, separators=(",", ":")).encode()
+
+
+def test_deep_nesting():
+    card = {"type": "AdaptiveCard", "body": []}
+    for i in range(5000):
+        card = {"type": "AdaptiveCard", "actions": [{"type": "Action.ShowCard", "card": card}]}
+    document = CardDocument.from_obj(card)
+    assert document.encode().count(b"Action.ShowCard") == 5000
+    assert document.to_dict()["actions"][0]["type"] == "Action.ShowCard"
@@ -0,0 +1,65 @@
+import copy
+
+from adaptive_card_builder.cards import AAACards
+from adaptive_card_builder.elements import (
+    SHARED_DATA_KEY,
+    SHARED_DATA_KEYS_KEY,
+    expand_chart_data,
+    qlik_chart,
+)
+
+HYPERCUBE = {"qHyperCube": {"qDataPages": [{"qMatrix": [[{"qNum": 1}], [{"qNum": 2}]]}]}}
+
+
+def charts(share_identity=True):
+    data = HYPERCUBE if share_identity else copy.deepcopy(HYPERCUBE)
+    chart = {"chartType": "barchart", "data": HYPERCUBE, "title": "Sales"}
+    alternatives = [
+        {"chartType": "linechart", "data": data},
+        {"chartType": "table", "data": {"qHyperCube": {}}},
+    ]
+    return chart, alternatives
+
+
+def test_identity_and_equal_data_are_shared_once():
+    for share_identity in (True, False):
+        element = qlik_chart(*charts(share_identity))
+        assert element[SHARED_DATA_KEY] == {"data": HYPERCUBE}
+        assert element["chart"] == {"chartType": "barchart", "title": "Sales", SHARED_DATA_KEYS_KEY: ["data"]}
+        assert element["alternativeChartTypes"][0] == {"chartType": "linechart", SHARED_DATA_KEYS_KEY: ["data"]}
+
+
+def test_alternatives_with_different_data_keep_it_inline():
+    element = qlik_chart(*charts())
+    assert element["alternativeChartTypes"][1] == {"chartType": "table", "data": {"qHyperCube": {}}}
+
+    chart = {"chartType": "barchart", "data": HYPERCUBE}
+    alone = qlik_chart(chart, [{"chartType": "table", "data": {"qHyperCube": {}}}])
+    assert SHARED_DATA_KEY not in alone
+    assert alone["chart"] is chart
+
+
+def test_inputs_are_not_mutated():
+    chart, alternatives = charts()
+    before = copy.deepcopy((chart, alternatives))
+    qlik_chart(chart, alternatives)
+    assert (chart, alternatives) == before
+
+
+def test_expand_gives_legacy_shape():
+    chart, alternatives = charts()
+    element = qlik_chart(chart, alternatives, expand=True)
+    assert element == {
+        "type": "Qlik.Chart",
+        "chart": chart,
+        "defaultChartType": "barchart",
+        "alternativeChartTypes": alternatives,
+    }
+    assert AAACards().create_chart(chart, alternatives, expand=True) == element
+
+
+def test_expand_chart_data_round_trips():
+    chart, alternatives = charts()
+    assert expand_chart_data(qlik_chart(chart, alternatives)) == qlik_chart(chart, alternatives, expand=True)
+    plain = qlik_chart({"chartType": "kpi"}, [])
+    assert expand_chart_data(plain) is plain
@@ -0,0 +1,61 @@
+import json
+
+from adaptive_card_builder.documents import freeze
+from adaptive_card_builder.encoding import FragmentCache, encode_card
+
+
+def dumps(obj):
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+BUTTONS = {"type": "ActionSet", "actions": [{"type": "Action.Submit", "title": "Gö \"now\"", "data": {"n": 1}}]}
+
+
+def test_spliced_fragments_match_plain_encoding():
+    fragment = freeze(BUTTONS)
+    card = {"type": "AdaptiveCard", "body": [fragment, {"type": "TextBlock", "text": "x"}, fragment]}
+    expected = dumps({"type": "AdaptiveCard", "body": [BUTTONS, {"type": "TextBlock", "text": "x"}, BUTTONS]})
+    assert encode_card(card) == expected
+    cache = FragmentCache()
+    assert encode_card(card, cache) == expected
+    assert encode_card(card, cache) == expected
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert encode_card(fragment, cache) == dumps(BUTTONS)
+
+
+def test_intern_dedupes_equal_content():
+    cache = FragmentCache()
+    first = cache.intern(BUTTONS)
+    second = cache.intern(json.loads(json.dumps(BUTTONS)))
+    assert first is second
+    assert cache.intern({"type": "TextBlock"}) is not first
+    assert cache.stats()["entries"] == 2
+    assert encode_card({"body": [first]}, cache) == dumps({"body": [BUTTONS]})
+
+
+def test_byte_bound_evicts_and_accounts_held_bytes():
+    fragments = [freeze({"type": "TextBlock", "text": str(i) * 40}) for i in range(10)]
+    size = len(dumps({"type": "TextBlock", "text": "0" * 40}))
+    cache = FragmentCache(max_bytes=size * 3)
+    for fragment in fragments:
+        cache.encoded(fragment)
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (3, size * 3, 7)
+    # the cache owns its bytes rather than filling the fragments' per-node caches
+    assert all(fragment._encoded is None for fragment in fragments)
+
+    cache.encoded(fragments[7])  # refresh; fragment 8 is now the oldest
+    cache.encoded(fragments[0])
+    assert cache.stats()["bytes"] == size * 3
+    assert cache.encoded(fragments[7]) and cache.hits == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == cache.stats()["bytes"] == 0
+
+
+def test_evicted_interned_content_is_interned_again():
+    cache = FragmentCache(max_entries=1)
+    first = cache.intern(BUTTONS)
+    cache.intern({"type": "TextBlock"})
+    assert cache.intern(BUTTONS) is not first
+    assert cache.stats()["entries"] == 1
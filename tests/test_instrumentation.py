@@ -0,0 +1,89 @@
+from adaptive_card_builder import elements, instrumentation, utils
+from adaptive_card_builder.cards import AAACards, aaa_cards
+from adaptive_card_builder.instrumentation import (
+    DEFAULT_BUCKETS,
+    CallbackSink,
+    InMemorySink,
+    PrometheusFileSink,
+    StageSample,
+)
+
+
+def test_wrappers_are_installed_only_while_enabled():
+    original = elements.text_block
+    method = AAACards.create_chart
+    instrumentation.enable(InMemorySink())
+    try:
+        assert elements.text_block is not original
+        assert aaa_cards.text_block is elements.text_block
+        assert AAACards.create_chart is not method
+        assert elements.text_block.__wrapped__ is original
+    finally:
+        instrumentation.disable()
+    assert elements.text_block is original
+    assert aaa_cards.text_block is original
+    assert AAACards.create_chart is method
+    assert not instrumentation.is_enabled()
+
+
+def test_enabled_calls_are_recorded_per_stage():
+    sink = InMemorySink()
+    instrumentation.enable(sink)
+    try:
+        utils.to_dict(elements.text_block("hello"))
+        elements.text_block("again")
+    finally:
+        instrumentation.disable()
+    elements.text_block("not recorded")
+    snapshot = sink.snapshot()
+    assert snapshot["elements.text_block"]["count"] == 2
+    assert snapshot["utils.to_dict"]["count"] == 1
+    assert sum(snapshot["elements.text_block"]["buckets"].values()) == 2
+
+
+def test_in_memory_sink_aggregates_samples():
+    sink = InMemorySink()
+    sink.record(StageSample("s", wall=0.00002, cpu=0.00001, net_blocks=3))
+    sink.record(StageSample("s", wall=2.0, cpu=1.0, net_blocks=-1))
+    stats = sink.snapshot()["s"]
+    assert (stats["count"], stats["net_blocks_total"], stats["wall_max"]) == (2, 2, 2.0)
+    assert stats["wall_total"] == 2.00002 and stats["cpu_total"] == 1.00001
+    assert stats["buckets"][0.00005] == 1
+    assert sum(stats["buckets"].values()) == 1  # 2.0 s is above the last bound
+    sink.reset()
+    assert sink.snapshot() == {}
+
+
+def test_prometheus_render_and_flush(tmp_path):
+    sink = PrometheusFileSink(str(tmp_path / "metrics.prom"), prefix="acb")
+    sink.record(StageSample("elements.qlik_tag", wall=0.0002, cpu=0.0001, net_blocks=4))
+    sink.record(StageSample("elements.qlik_tag", wall=5.0, cpu=0.5, net_blocks=-2))
+    lines = sink.render().splitlines()
+    label = 'stage="elements.qlik_tag"'
+    assert lines[:4] == [
+        "# TYPE acb_stage_calls_total counter",
+        "# TYPE acb_stage_cpu_seconds_total counter",
+        "# TYPE acb_stage_net_blocks gauge",
+        "# TYPE acb_stage_wall_seconds histogram",
+    ]
+    assert f"acb_stage_calls_total{{{label}}} 2" in lines
+    assert f"acb_stage_net_blocks{{{label}}} 2" in lines
+    assert f'acb_stage_wall_seconds_bucket{{{label},le="0.0001"}} 0' in lines
+    assert f'acb_stage_wall_seconds_bucket{{{label},le="0.0005"}} 1' in lines
+    assert f'acb_stage_wall_seconds_bucket{{{label},le="{DEFAULT_BUCKETS[-1]}"}} 1' in lines
+    assert f'acb_stage_wall_seconds_bucket{{{label},le="+Inf"}} 2' in lines
+    assert f"acb_stage_wall_seconds_count{{{label}}} 2" in lines
+    sink.flush()
+    assert (tmp_path / "metrics.prom").read_text() == sink.render()
+    assert not (tmp_path / "metrics.prom.tmp").exists()
+
+
+def test_callback_sink_forwards_samples():
+    samples = []
+    instrumentation.enable(CallbackSink(samples.append))
+    try:
+        elements.qlik_tag("t", "s", "info")
+    finally:
+        instrumentation.disable()
+    assert [sample.stage for sample in samples] == ["elements.qlik_tag"]
+    assert samples[0].wall >= 0 and isinstance(samples[0].net_blocks, int)
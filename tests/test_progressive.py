@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from adaptive_card_builder import progressive
+from adaptive_card_builder.cards import AAACards
+from adaptive_card_builder.progressive import assemble, assemble_async
+
+TOP_BAR = {"analysisType": "KPI", "title": "Sales"}
+CHART = {"chart": {"chartType": "kpi"}, "alternative_chart_types": []}
+
+
+class SlowCards(AAACards):
+    def create_top_bar(self, **kwargs):
+        time.sleep(0.2)
+        return {"type": "TextBlock", "text": "top"}
+
+    def create_chart(self, **kwargs):
+        time.sleep(0.2)
+        return {"type": "TextBlock", "text": "chart"}
+
+
+def test_updates_follow_completion_order():
+    top_bar, chart = Future(), Future()
+    updates = assemble({"top_bar": top_bar, "chart": chart})
+    skeleton = next(updates)
+    assert (skeleton.section, skeleton.complete) == ("skeleton", False)
+    chart.set_result(CHART)
+    assert next(updates).section == "chart"
+    top_bar.set_result(TOP_BAR)
+    last = next(updates)
+    assert (last.section, last.complete) == ("top_bar", True)
+    assert json.loads(last.encoded) == json.loads(json.dumps(last.body))
+    assert list(updates) == []
+
+
+def test_each_section_is_encoded_once(monkeypatch):
+    calls = []
+    encode = progressive.encode_card
+
+    def counting(part, *args):
+        calls.append(part)
+        return encode(part, *args)
+
+    monkeypatch.setattr(progressive, "encode_card", counting)
+    updates = list(assemble({"top_bar": TOP_BAR, "chart": CHART}))
+    assert len(updates) == 3
+    assert len(calls) == 3 + 2  # skeleton slots, then one per section
+
+
+def test_failed_input_future_propagates():
+    source = Future()
+    updates = assemble({"top_bar": source})
+    next(updates)
+    source.set_exception(RuntimeError("upstream failed"))
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        next(updates)
+
+
+def test_async_sections_overlap_off_the_loop():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        background = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sections = [
+                update.section
+                async for update in assemble_async(
+                    {"top_bar": TOP_BAR, "chart": CHART}, SlowCards(), executor
+                )
+            ]
+        elapsed = time.perf_counter() - started
+        background.cancel()
+        return sections, elapsed, ticks
+
+    sections, elapsed, ticks = asyncio.run(main())
+    assert sections[0] == "skeleton" and sorted(sections[1:]) == ["chart", "top_bar"]
+    assert elapsed < 0.35  # two 0.2 s sections built concurrently
+    assert ticks >= 5  # the event loop kept running meanwhile
@@ -0,0 +1,144 @@
+from datetime import date, time
+
+import pytest
+
+from adaptive_card_builder.elements import (
+    action_set,
+    input_choice_set,
+    input_date,
+    input_number,
+    input_text,
+    input_time,
+    input_toggle,
+)
+from adaptive_card_builder.router import ActionRouter, PayloadSchema, ValidationError, parse_action
+
+CHOICES = [{"title": "A", "value": "a"}, {"title": "B", "value": "b"}]
+
+
+def decode_one(element, raw):
+    """Decode ``raw`` as the value of a single input; return the value or the error."""
+    try:
+        return PayloadSchema([element]).decode({element["id"]: raw})[element["id"]]
+    except ValidationError as e:
+        return ValidationError, e.errors[element["id"]]
+
+
+def rejected(element, raw):
+    result = decode_one(element, raw)
+    return isinstance(result, tuple) and result[0] is ValidationError
+
+
+def test_text_decoder():
+    element = input_text("name", max_length=5, regex=r"[a-z]+")
+    assert decode_one(element, "abc") == "abc"
+    assert decode_one(element, "") is None
+    assert decode_one(element, "abcdef") == (ValidationError, "longer than 5 characters")
+    assert rejected(element, "ab1")
+
+
+def test_number_decoder():
+    element = input_number("n", min=0, max=5000)
+    assert decode_one(element, "1e3") == 1000 and isinstance(decode_one(element, "1e3"), int)
+    assert decode_one(element, "2.0") == 2.0 and isinstance(decode_one(element, "2.0"), float)
+    assert decode_one(element, 7) == 7
+    assert decode_one(element, True) == (ValidationError, "not a number")
+    assert rejected(element, "abc")
+    assert rejected(element, "nan")
+    assert decode_one(element, "-1") == (ValidationError, "less than 0")
+    assert decode_one(element, 5001) == (ValidationError, "greater than 5000")
+
+
+def test_date_and_time_decoders():
+    day = input_date("d", min="2024-01-01", max="2024-12-31")
+    assert decode_one(day, "2024-06-01") == date(2024, 6, 1)
+    assert decode_one(day, "2023-12-31") == (ValidationError, "earlier than 2024-01-01")
+    assert decode_one(day, "2025-01-01") == (ValidationError, "later than 2024-12-31")
+    assert decode_one(day, "June 1") == (ValidationError, "not a valid date")
+
+    hour = input_time("t", min="09:00", max="17:00")
+    assert decode_one(hour, "12:30") == time(12, 30)
+    assert rejected(hour, "08:59")
+    assert rejected(hour, "17:01")
+    assert decode_one(hour, "noon") == (ValidationError, "not a valid time")
+
+
+def test_toggle_decoder():
+    element = input_toggle("t", "Subscribe", value_on="yes", value_off="no")
+    assert decode_one(element, "yes") is True
+    assert decode_one(element, "no") is False
+    assert rejected(element, "true")
+    assert decode_one(input_toggle("t", "Subscribe"), True) is True
+
+
+def test_choice_set_decoder():
+    single = input_choice_set("c", CHOICES)
+    assert decode_one(single, "a") == "a"
+    assert decode_one(single, "c") == (ValidationError, "'c' is not one of the choices")
+
+    multi = input_choice_set("c", CHOICES, is_multi_select=True)
+    assert decode_one(multi, "a,b") == ["a", "b"]
+    assert decode_one(multi, ["b"]) == ["b"]
+    assert rejected(multi, "a,c")
+
+    typeahead = input_choice_set("c", CHOICES, **{"choices.data": {"type": "Data.Query", "dataset": "x"}})
+    assert decode_one(typeahead, "anything") == "anything"
+
+
+def test_required_and_passthrough():
+    schema = PayloadSchema([input_text("name", isRequired=True), input_number("n")])
+    assert schema.fields == ("name", "n")
+    assert schema.decode({"name": "x", "extra": 1}) == {"name": "x", "extra": 1}
+    with pytest.raises(ValidationError) as e:
+        schema.decode({"n": "x"})
+    assert e.value.errors == {"name": "is required", "n": "not a number"}
+
+
+def test_from_card_finds_nested_inputs():
+    card = {
+        "type": "AdaptiveCard",
+        "body": [
+            {"type": "Container", "items": [input_text("a")]},
+            action_set([{"type": "Action.ShowCard", "card": {"type": "AdaptiveCard", "body": [input_number("b")]}}]),
+            {"type": "Input.Text"},  # no id: ignored
+        ],
+    }
+    assert PayloadSchema.from_card(card).fields == ("a", "b")
+
+
+def test_parse_action_payload_shapes():
+    invoke = {"action": {"type": "Action.Execute", "verb": "addToNewSheet", "sheetId": "s1", "data": {"x": 1}}}
+    assert parse_action(invoke) == ("addToNewSheet", "Action.Execute", {"x": 1, "sheetId": "s1"})
+
+    toggle = {"type": "Action.ToggleVisibility", "verb": "elaborate", "targetElements": ["t"]}
+    assert parse_action(toggle) == ("elaborate", "Action.ToggleVisibility", {})
+
+    submit = {"verb": "submitFeedback", "comment": "ok"}
+    assert parse_action(submit) == ("submitFeedback", "Action.Submit", submit)
+
+
+def test_dispatch_falls_back_from_verb_to_type_to_default():
+    calls = []
+    router = ActionRouter()
+
+    @router.route("submitFeedback", schema=PayloadSchema([input_number("score", isRequired=True)]))
+    def feedback(data, payload):
+        calls.append(("verb", data))
+
+    router.register("Action.Submit", lambda data, payload: calls.append(("type", data)))
+
+    router.dispatch({"verb": "submitFeedback", "score": "3"})
+    router.dispatch({"verb": "unknown", "note": "n"})
+    assert calls == [
+        ("verb", {"verb": "submitFeedback", "score": 3}),
+        ("type", {"verb": "unknown", "note": "n"}),
+    ]
+    assert "submitFeedback" in router and "missing" not in router
+
+    with pytest.raises(ValidationError):
+        router.dispatch({"verb": "submitFeedback", "score": "high"})
+    with pytest.raises(KeyError):
+        router.dispatch({"action": {"type": "Action.Execute", "verb": "unrouted"}})
+
+    router.default = lambda data, payload: "default"
+    assert router.dispatch({"action": {"type": "Action.Execute", "verb": "unrouted"}}) == "default"
@@ -0,0 +1,109 @@
+import http.client
+import json
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from adaptive_card_builder import serve
+from adaptive_card_builder.serve import CardService, make_server
+
+
+@pytest.fixture
+def server():
+    service = CardService(workers=0, queue_size=0)
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def connect(httpd):
+    return http.client.HTTPConnection(*httpd.server_address[:2], timeout=5)
+
+
+def post(conn, path, body):
+    conn.request("POST", path, body=json.dumps(body) if not isinstance(body, bytes) else body)
+    response = conn.getresponse()
+    return response.status, response.read(), response
+
+
+def test_statuses_over_one_keep_alive_connection(server):
+    conn = connect(server)
+    status, body, _ = post(conn, "/v1/create_top_bar", {"analysisType": "KPI", "title": "Sales"})
+    assert status == 200 and json.loads(body)
+    status, body, _ = post(conn, "/v1/create_chart", {"chart": {}, "alternative_chart_types": []})
+    assert (status, json.loads(body)) == (400, {"error": "chart: missing chartType"})
+    assert post(conn, "/v1/create_top_bar", {"analysisType": 1})[0] == 400
+    assert post(conn, "/v1/create_top_bar", {"bogus": 1})[0] == 400
+    assert post(conn, "/v1/unknown", {})[0] == 404
+    conn.request("GET", "/nothing")
+    response = conn.getresponse()
+    assert (response.status, response.read()) == (404, b'{"error": "Not found"}')
+
+    server.RequestHandlerClass.service._slots.acquire()
+    try:
+        status, _, response = post(conn, "/v1/create_skeleton", {})
+        assert (status, response.getheader("Retry-After")) == (503, "1")
+    finally:
+        server.RequestHandlerClass.service._slots.release()
+
+    conn.request("GET", "/healthz")
+    health = json.loads(conn.getresponse().read())
+    assert (health["requests"], health["shed"], health["in_flight"]) == (2, 1, 0)
+    conn.close()
+
+
+def test_invalid_content_length_closes_connection(server):
+    conn = connect(server)
+    conn.putrequest("POST", "/v1/create_skeleton")
+    conn.putheader("Content-Length", "nope")
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 400
+    assert response.getheader("Connection") == "close"
+    assert json.loads(response.read()) == {"error": "Invalid Content-Length"}
+    conn.close()
+
+
+def test_timed_out_render_keeps_its_slot(monkeypatch):
+    release = threading.Event()
+
+    def slow_render(method, kwargs, fmt):
+        release.wait(5)
+        return b"{}"
+
+    monkeypatch.setattr(serve, "_render", slow_render)
+    service = CardService(workers=0, queue_size=0, timeout=0.05)
+    service.executor = ThreadPoolExecutor(max_workers=1)
+    with pytest.raises(FutureTimeoutError):
+        service.render("create_skeleton", {}, "json")
+    assert service.render("create_skeleton", {}, "json") is None  # still running: shed
+    release.set()
+    service.executor.shutdown(wait=True)
+    service.executor = ThreadPoolExecutor(max_workers=1)
+    assert service.render("create_skeleton", {}, "json") == b"{}"
+    assert service.health()["in_flight"] == 0
+    service.shutdown()
+
+
+def test_crashed_worker_pool_is_replaced():
+    service = CardService(workers=1, queue_size=1)
+    try:
+        for pid in list(service.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        with pytest.raises(BrokenProcessPool):
+            for _ in range(2):  # the pool may notice the crash on submit or on result
+                service.render("create_skeleton", {}, "json")
+        assert json.loads(service.render("create_skeleton", {}, "json"))
+        assert service.health()["restarts"] == 1
+        assert service.health()["in_flight"] == 0
+    finally:
+        service.shutdown()
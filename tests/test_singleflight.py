@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from adaptive_card_builder.singleflight import CoalescingCards, SingleFlight, make_key
+from adaptive_card_builder.text import TextNormalizer
+
+
+def test_leader_cancellation_does_not_fail_followers():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def build():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "card"
+
+        leader = asyncio.ensure_future(flight.do_async("key", build))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(flight.do_async("key", build)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results, calls, flight.in_flight()
+
+    assert asyncio.run(main()) == (["card"] * 3, [1], 0)
+
+
+def test_build_errors_fan_out():
+    async def main():
+        flight = SingleFlight()
+
+        async def build():
+            await asyncio.sleep(0.01)
+            raise KeyError("chartType")
+
+        return await asyncio.gather(
+            *(flight.do_async("key", build) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(result, KeyError) for result in asyncio.run(main()))
+
+
+def test_make_key_keys_normalizers_by_configuration():
+    key = make_key("create_top_bar", ("K", "T"), {"normalizer": TextNormalizer()})
+    assert key == make_key("create_top_bar", ("K", "T"), {"normalizer": TextNormalizer()})
+    assert key != make_key("create_top_bar", ("K", "T"), {"normalizer": TextNormalizer(max_length=5)})
+
+
+def test_render_with_normalizer():
+    payload = CoalescingCards().render("create_top_bar", "KPI", "Total  Sales", normalizer=TextNormalizer())
+    assert b"Total Sales" in payload
@@ -0,0 +1,58 @@
+from adaptive_card_builder.targets import QLIK, TEAMS, TargetRenderer
+
+
+def test_data_payloads_are_not_transformed():
+    submit = {"type": "Action.Submit", "data": {"content": "keep me", "type": "Qlik.Tag"}}
+    card = {"type": "AdaptiveCard", "body": [{"type": "ActionSet", "actions": [submit]}]}
+    assert TEAMS.apply(card)["body"][0]["actions"][0] is submit
+
+
+def test_elements_are_rewritten_and_unchanged_subtrees_shared():
+    plain = {"type": "TextBlock", "text": "a"}
+    card = {
+        "type": "AdaptiveCard",
+        "body": [
+            plain,
+            {"type": "Qlik.Skeleton", "isSkeleton": True},
+            {"type": "Container", "fullWidth": True, "items": [{"type": "Qlik.Tag", "text": "t"}]},
+        ],
+    }
+    body = TEAMS.apply(card)["body"]
+    assert body[0] is plain
+    assert body[1] == {"type": "Container", "items": [
+        {"type": "TextBlock", "text": "t", "size": "small", "weight": "bolder", "color": "default"}
+    ]}
+
+
+def test_renderer_caches_by_key():
+    renderer = TargetRenderer()
+    card = {"type": "AdaptiveCard", "body": [{"type": "Qlik.Tag", "text": "t"}]}
+    first = renderer.render(card, [QLIK, TEAMS], key="card-1")
+    second = renderer.render(card, [QLIK, TEAMS], key="card-1")
+    assert first == second
+    assert (renderer.hits, renderer.misses) == (2, 2)
+    assert b"Qlik.Tag" not in first["teams"]
+
+
+def test_menu_dropdown_entries_are_filtered_and_spliced():
+    card = {
+        "type": "AdaptiveCard",
+        "body": [{
+            "type": "ActionSet",
+            "actions": [{
+                "type": "Action.MenuDropdown",
+                "actions": [
+                    {"type": "Action.ShowModal", "title": "modal"},
+                    {"type": "Action.Submit", "title": "skeleton", "isSkeleton": True},
+                    {"type": "Action.MenuDropdown", "actions": [{"type": "Action.Submit", "title": "nested"}]},
+                    {"type": "Action.OpenUrl", "title": "open", "url": "https://example.com"},
+                ],
+            }],
+        }],
+    }
+    actions = TEAMS.apply(card)["body"][0]["actions"]
+    assert actions == [
+        {"type": "Action.Submit", "title": "nested"},
+        {"type": "Action.OpenUrl", "title": "open", "url": "https://example.com"},
+    ]
+    assert b"Action.ShowModal" not in TargetRenderer().render(card, [TEAMS])["teams"]
@@ -0,0 +1,22 @@
+from adaptive_card_builder.elements import fact_set
+from adaptive_card_builder.text import TextNormalizer, normalize_card
+from adaptive_card_builder.utils import to_dict
+
+
+def test_truncation_counts_escapes():
+    normalizer = TextNormalizer(max_length=10, escape_markdown=True)
+    for text in ["a*b*c*d*e*f*g*h*i*j*k*l", "abcdefgh*ijkl", "# heading text long"]:
+        result = normalizer(text)
+        assert len(result) <= 10
+        body = result[: -len(normalizer.ellipsis)]
+        assert (len(body) - len(body.rstrip("\\"))) % 2 == 0
+
+
+def test_zero_width_space_is_kept():
+    assert TextNormalizer()("a​b  c") == "a​b c"
+
+
+def test_fact_text_is_normalized():
+    card = to_dict(fact_set([{"title": "  a  b ", "value": "x\x00y"}]))
+    facts = normalize_card(card, TextNormalizer())["facts"]
+    assert (facts[0]["title"], facts[0]["value"]) == ("a b", "xy")
@@ -0,0 +1,57 @@
+import json
+import threading
+
+from adaptive_card_builder.cards import AAACards
+from adaptive_card_builder.threaded import StripedCache, ThreadedRenderer
+
+
+class ThreadRecordingCards(AAACards):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def create_skeleton(self):
+        self.threads.add(threading.get_ident())
+        return super().create_skeleton()
+
+
+def test_batch_output_keeps_request_order_across_chunks():
+    requests = [("create_top_bar", ("KPI", f"title {i}"), {}) for i in range(40)]
+    with ThreadedRenderer(max_workers=4) as renderer:
+        payloads = renderer.render_batch(requests)
+    assert len(payloads) == 40
+    for i, payload in enumerate(payloads):
+        assert f"title {i}\"" in payload.decode()
+
+
+def test_cached_results_are_shared():
+    cache = StripedCache()
+    with ThreadedRenderer(max_workers=2, cache=cache) as renderer:
+        first, second = renderer.render_batch([("create_skeleton", (), {})] * 2)
+    assert first == second
+    assert len(cache) == 1
+    assert json.loads(first)
+
+
+def test_striped_cache_evicts_least_recently_used_per_stripe():
+    cache = StripedCache(max_entries=4, stripes=2)  # two entries per stripe
+    for key in (0, 2, 1):
+        cache.put(key, f"v{key}")
+    assert cache.get(0) == "v0"  # refresh 0; 2 is now the oldest in stripe 0
+    cache.put(4, "v4")
+    assert cache.get(2) is None
+    assert (cache.get(0), cache.get(4), cache.get(1)) == ("v0", "v4", "v1")
+    cache.put(3, "v3")
+    cache.put(5, "v5")  # stripe 1 evicts 1, stripe 0 is untouched
+    assert cache.get(1) is None
+    assert len(cache) == 4
+
+
+def test_single_worker_and_single_item_batches_run_inline():
+    cards = ThreadRecordingCards()
+    with ThreadedRenderer(max_workers=1, cards=cards) as renderer:
+        assert renderer._pool is None
+        renderer.render_batch([("create_skeleton", (), {})] * 3)
+    with ThreadedRenderer(max_workers=4, cards=cards) as renderer:
+        renderer.render_batch([("create_skeleton", (), {})])
+    assert cards.threads == {threading.get_ident()}
@@ -0,0 +1,89 @@
+import pytest
+
+from adaptive_card_builder import AAACards
+from adaptive_card_builder.utils import _recursive_render, prettify_json
+
+
+def reference_render(obj):
+    """The original recursive implementation."""
+    if hasattr(obj, "render") and callable(obj.render):
+        return reference_render(obj.render())
+    if isinstance(obj, list):
+        return [reference_render(item) for item in obj]
+    if isinstance(obj, dict):
+        return {k: reference_render(v) for k, v in obj.items()}
+    return obj
+
+
+class Renderable:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def render(self):
+        self.calls += 1
+        return self.value
+
+
+def sample_tree():
+    inner = Renderable({"type": "TextBlock", "text": "inner", "items": [1, 2.5, None, True]})
+    return {
+        "type": "AdaptiveCard",
+        "body": [
+            Renderable([inner, {"type": "Container", "items": []}]),
+            Renderable(Renderable("chained")),
+            {"type": "Container", "items": [inner, "plain", 0]},
+        ],
+        "actions": [],
+    }
+
+
+def test_matches_original_output():
+    assert _recursive_render(sample_tree()) == reference_render(sample_tree())
+    aaa = AAACards()
+    for card in [
+        aaa.create_skeleton(),
+        aaa.create_chart({"chartType": "barchart"}, [{"chartType": "linechart"}]),
+    ]:
+        assert _recursive_render(card) == reference_render(card)
+    assert prettify_json(sample_tree()) == prettify_json(reference_render(sample_tree()))
+
+
+def test_plain_subtrees_are_shared_and_input_is_not_mutated():
+    plain = {"type": "Container", "items": [{"type": "TextBlock", "text": "a"}]}
+    card = {"body": [plain, Renderable({"type": "Image"})]}
+    result = _recursive_render(card)
+    assert result is not card
+    assert result["body"][0] is plain
+    assert isinstance(card["body"][1], Renderable)
+    assert _recursive_render(plain) is plain
+
+
+def test_deep_nesting():
+    card = {"type": "AdaptiveCard", "body": []}
+    for i in range(10000):
+        card = {"type": "AdaptiveCard", "actions": [{"type": "Action.ShowCard", "card": Renderable(card)}]}
+    result = _recursive_render(card)
+    depth = 0
+    while "actions" in result:
+        result = result["actions"][0]["card"]
+        depth += 1
+    assert depth == 10000
+
+
+def test_shared_subtree_rendered_once():
+    shared = Renderable({"type": "TextBlock", "text": "shared"})
+    result = _recursive_render({"body": [shared, shared, {"items": [shared]}]})
+    assert shared.calls == 1
+    assert result["body"][0] is result["body"][1] is result["body"][2]["items"][0]
+
+
+def test_cycles_are_detected():
+    items = []
+    items.append({"items": items})
+    with pytest.raises(ValueError, match="Circular reference"):
+        _recursive_render({"body": items})
+    node = {"type": "Container"}
+    node["items"] = [Renderable(node)]
+    with pytest.raises(ValueError, match="Circular reference"):
+        _recursive_render(node)